@@ -1,14 +1,34 @@
+import argparse
+import ctypes
+import ctypes.util
+import errno
+import mmap
+import os
+import pickle
 import random
+import secrets
+import select
+import signal
+import sqlite3
+import stat
+import struct
+import sys
+import threading
+import time
 import math
 import hashlib
+import logging
+import json
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from textual.app import App, ComposeResult
-from textual.widgets import Button, Input, Static, Label, Header, Select
+from textual.widgets import Button, Input, Static, Label, Header, Select, DataTable
 from textual.containers import Vertical, Horizontal, Container, HorizontalScroll, VerticalScroll
 from textual.color import Color
 from textual.screen import ModalScreen, Screen
 from textual.theme import Theme, BUILTIN_THEMES as TEXTUAL_THEMES
 from textual import on
-from tkinter.filedialog import askopenfilename
+
+logger = logging.getLogger(__name__)
 
 galaxy_primary = Color.parse("#C45AFF")
 galaxy_secondary = Color.parse("#a684e8")
@@ -88,31 +108,1216 @@ def mod_pow(base, exponent, modulus):
     return result
 
 
+def digest_to_int(hash_hex, n):
+    """Đổi hexdigest thành số nguyên, từ chối giá trị không nhỏ hơn modulus n.
+
+    Nếu rút gọn h mod n thì các digest khác nhau (h và h + n) sẽ có cùng chữ ký.
+    """
+    h_int = int(hash_hex, 16)
+    if h_int >= n:
+        raise ValueError("Giá trị băm lớn hơn modulus n. Hãy dùng khóa lớn hơn hoặc thuật toán băm ngắn hơn.")
+    return h_int
+
 
 def verify_signature(hash256, signature, public_key):
-    """Xác minh chữ ký số bằng khóa công khai và SHA-256 (hexdigest)."""
+    """Xác minh chữ ký số bằng khóa công khai và giá trị băm (hexdigest)."""
     n, e = public_key
-    h_int = int(hash256, 16) % n
-    h_prime = mod_pow(signature, e, n)
+    h_int = int(hash256, 16)
+    if h_int >= n:
+        return False
+    h_prime = pow(signature, e, n)
     # So sánh h và h'
     return h_int == h_prime
 
 
+def verify_many(hashes, signatures, public_key, processes=1):
+    """Xác minh hàng loạt các cặp (hexdigest, chữ ký) với cùng một khóa công khai.
+
+    Với processes > 1 các lô được xác minh song song qua KeyPool.
+    Kết quả giữ đúng thứ tự đầu vào.
+    """
+    if processes != 1:
+        with KeyPool(KeyContext.from_keys(public_key), processes) as pool:
+            return pool.verify(hashes, signatures)
+    return _verify_ints((int(h, 16) for h in hashes), signatures, public_key)
+
+
+def _verify_ints(h_ints, signatures, public_key):
+    """Lõi của verify_many: băm và chữ ký đều là số nguyên."""
+    n, e = public_key
+    return [h_int < n and h_int == pow(signature, e, n) for h_int, signature in zip(h_ints, signatures)]
+
+
 def sign_message(private_key, hash256):
-    """Ký chữ ký số cho thông điệp bằng khóa bí mật và SHA-256 (hexdigest)."""
+    """Ký chữ ký số cho thông điệp bằng khóa bí mật và giá trị băm (hexdigest)."""
     n, d = private_key
     # Chuyển chuỗi hex thành số nguyên
-    h_int = int(hash256, 16) % n
+    h_int = digest_to_int(hash256, n)
     # Tính chữ ký: s = h^d mod n
     signature = mod_pow(h_int, d, n)
     return signature
 
 
-def hash_file_256(message):
-    h = hashlib.sha256(message.encode('utf-8')).hexdigest()
+def crt_params(p, q, d):
+    """Tính tham số CRT (p, q, dp, dq, q_inv) cho khóa bí mật d."""
+    if p < q:
+        p, q = q, p
+    return p, q, d % (p - 1), d % (q - 1), pow(q, -1, p)
+
+
+class KeyContext:
+    """Ngữ cảnh khóa đã tính sẵn (CRT, dấu vân tay).
+
+    Chỉ đọc sau khi tạo; được tuần tự hóa một lần và nạp vào mỗi tiến trình con
+    qua initializer của nhóm tiến trình thay vì dựng lại cho từng tác vụ.
+    """
+
+    __slots__ = ("n", "e", "d", "crt", "fingerprint")
+
+    def __init__(self, n, e=None, d=None, crt=None, fingerprint=None):
+        self.n = n
+        self.e = e
+        self.d = d
+        self.crt = crt
+        self.fingerprint = fingerprint
+
+    @classmethod
+    def from_keys(cls, public_key=None, private_key=None, primes=None):
+        n = e = d = None
+        if public_key is not None:
+            n, e = public_key
+        if private_key is not None:
+            n, d = private_key
+        crt = crt_params(primes[0], primes[1], d) if primes and d is not None else None
+        fingerprint = key_fingerprint((n, e)) if e else None
+        return cls(n, e, d, crt, fingerprint)
+
+    def __getstate__(self):
+        return self.n, self.e, self.d, self.crt, self.fingerprint
+
+    def __setstate__(self, state):
+        self.__init__(*state)
+
+    def serialize(self):
+        return pickle.dumps(self, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @staticmethod
+    def deserialize(data):
+        return pickle.loads(data)
+
+    def sign_int(self, m):
+        """Ký số nguyên m (0 <= m < n), dùng CRT nếu có."""
+        if self.crt is None:
+            return pow(m, self.d, self.n)
+        p, q, dp, dq, q_inv = self.crt
+        s1 = pow(m % p, dp, p)
+        s2 = pow(m % q, dq, q)
+        return s2 + q * ((s1 - s2) * q_inv % p)
+
+    def sign_hashes(self, hashes):
+        """Ký một lô hexdigest, giữ nguyên thứ tự."""
+        n = self.n
+        sign_int = self.sign_int
+        return [sign_int(digest_to_int(h, n)) for h in hashes]
+
+    def verify_pairs(self, hashes, signatures):
+        """Xác minh một lô (hexdigest, chữ ký), giữ nguyên thứ tự."""
+        return _verify_ints((int(h, 16) for h in hashes), signatures, (self.n, self.e))
+
+
+WINDOW_BITS = 4
+
+
+def mod_pow_window(base, exponent, modulus, bits=None):
+    """Lũy thừa modulo cửa sổ cố định với dãy phép toán đồng nhất.
+
+    Số cửa sổ chỉ phụ thuộc vào bits (mặc định là độ dài modulus), mỗi cửa sổ
+    luôn gồm WINDOW_BITS phép bình phương và một phép nhân, kể cả khi các bit
+    của số mũ bằng 0. Số mũ dài hơn bits được mở rộng số cửa sổ thay vì cắt bớt.
+    """
+    bits = max(bits or modulus.bit_length(), exponent.bit_length())
+    windows = -(-bits // WINDOW_BITS)
+    mask = (1 << WINDOW_BITS) - 1
+
+    base %= modulus
+    table = [1 % modulus, base]
+    for _ in range(2, 1 << WINDOW_BITS):
+        table.append(table[-1] * base % modulus)
+
+    result = 1 % modulus
+    for i in range(windows - 1, -1, -1):
+        for _ in range(WINDOW_BITS):
+            result = result * result % modulus
+        result = result * table[(exponent >> (i * WINDOW_BITS)) & mask] % modulus
+    return result
+
+
+class HardenedSigner:
+    """Ký chữ ký với làm mù cơ sở (base blinding) và lũy thừa cửa sổ cố định.
+
+    Cặp (r^e, r^-1) được tạo một lần rồi bình phương sau mỗi chữ ký, nên chi phí
+    làm mù chỉ là vài phép nhân. Cần ngữ cảnh có cả e và d.
+    """
+
+    def __init__(self, context: KeyContext) -> None:
+        if context.e is None or context.d is None:
+            raise ValueError("Chế độ ký an toàn cần cả khóa công khai và khóa bí mật.")
+        self.context = context
+        self._lock = threading.Lock()
+        self._blind, self._unblind = self._new_blinding()
+
+    def _new_blinding(self):
+        n = self.context.n
+        while True:
+            r = secrets.randbelow(n - 2) + 2
+            if math.gcd(r, n) == 1:
+                return pow(r, self.context.e, n), pow(r, -1, n)
+
+    def sign_int(self, m):
+        """Ký số nguyên m (0 <= m < n)."""
+        context = self.context
+        n = context.n
+        with self._lock:
+            blind, unblind = self._blind, self._unblind
+            self._blind = blind * blind % n
+            self._unblind = unblind * unblind % n
+
+        m = m * blind % n
+        if context.crt is None:
+            s = mod_pow_window(m, context.d, n)
+        else:
+            p, q, dp, dq, q_inv = context.crt
+            s1 = mod_pow_window(m % p, dp, p)
+            s2 = mod_pow_window(m % q, dq, q)
+            s = s2 + q * ((s1 - s2) * q_inv % p)
+        return s * unblind % n
+
+    def sign_hashes(self, hashes):
+        """Ký một lô hexdigest, giữ nguyên thứ tự."""
+        n = self.context.n
+        sign_int = self.sign_int
+        return [sign_int(digest_to_int(h, n)) for h in hashes]
+
+
+_WORKER_CONTEXT = None
+_WORKER_SIGNER = None
+
+
+def _init_worker_context(data, hardened=False):
+    """Initializer của tiến trình con: nạp ngữ cảnh khóa đúng một lần."""
+    global _WORKER_CONTEXT, _WORKER_SIGNER
+    _WORKER_CONTEXT = KeyContext.deserialize(data)
+    _WORKER_SIGNER = HardenedSigner(_WORKER_CONTEXT) if hardened else _WORKER_CONTEXT
+
+
+def _sign_task(hashes):
+    return _WORKER_SIGNER.sign_hashes(hashes)
+
+
+def _verify_task(pairs):
+    hashes, signatures = pairs
+    return _WORKER_CONTEXT.verify_pairs(hashes, signatures)
+
+
+class KeyPool:
+    """Nhóm tiến trình dùng chung một KeyContext cho mọi tác vụ ký và xác minh.
+
+    Dùng như context manager; có thể gọi sign/verify nhiều lần trên cùng nhóm.
+    Với hardened=True mỗi tiến trình ký bằng HardenedSigner riêng.
+    """
+
+    def __init__(self, context: KeyContext, processes: int | None = None, chunk_size: int = 256,
+                 hardened: bool = False) -> None:
+        self.context = context
+        self.hardened = hardened
+        self.signer = HardenedSigner(context) if hardened else context
+        self.processes = processes or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self._executor = None
+
+    def __enter__(self):
+        if self.processes > 1:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.processes,
+                initializer=_init_worker_context,
+                initargs=(self.context.serialize(), self.hardened),
+            )
+        return self
+
+    def __exit__(self, *exc):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def _chunks(self, items):
+        size = self.chunk_size
+        return [items[i:i + size] for i in range(0, len(items), size)]
+
+    def sign(self, hashes):
+        hashes = list(hashes)
+        if self._executor is None or len(hashes) <= self.chunk_size:
+            return self.signer.sign_hashes(hashes)
+        signatures = []
+        for part in self._executor.map(_sign_task, self._chunks(hashes)):
+            signatures.extend(part)
+        return signatures
+
+    def verify(self, hashes, signatures):
+        hashes = list(hashes)
+        signatures = list(signatures)
+        if self._executor is None or len(hashes) <= self.chunk_size:
+            return self.context.verify_pairs(hashes, signatures)
+        pairs = zip(self._chunks(hashes), self._chunks(signatures))
+        results = []
+        for part in self._executor.map(_verify_task, pairs):
+            results.extend(part)
+        return results
+
+
+def sign_many(private_key, hashes, primes=None, processes=None, chunk_size=256,
+              public_key=None, hardened=False):
+    """Ký hàng loạt hexdigest với cùng một khóa bí mật.
+
+    Nếu biết primes = (p, q) thì dùng CRT. Các lô được chia cho nhiều tiến trình,
+    kết quả trả về theo đúng thứ tự đầu vào. hardened=True (cần public_key) bật
+    làm mù và lũy thừa cửa sổ cố định.
+    """
+    context = KeyContext.from_keys(public_key, private_key, primes)
+    with KeyPool(context, processes, chunk_size, hardened) as pool:
+        return pool.sign(hashes)
+
+
+READ_BLOCK_SIZE = 1 << 20
+
+
+def _advise_sequential(fd):
+    """Báo cho nhân hệ điều hành rằng tệp sẽ được đọc tuần tự (nếu hỗ trợ)."""
+    if hasattr(os, "posix_fadvise"):
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        except OSError:
+            pass
+
+
+def update_hash_from_file(h, file_path, block_size=READ_BLOCK_SIZE):
+    """Nạp nội dung tệp vào đối tượng băm h mà không sao chép toàn bộ tệp.
+
+    Tệp thường được ánh xạ bằng mmap và đưa thẳng vào hashlib. Pipe và tệp đặc biệt
+    được đọc bằng readinto vào một bytearray cấp phát sẵn.
+    """
+    with open(file_path, 'rb', buffering=0) as f:
+        fd = f.fileno()
+        _advise_sequential(fd)
+
+        if stat.S_ISREG(os.fstat(fd).st_mode):
+            try:
+                mapped = mmap.mmap(fd, 0, access=mmap.ACCESS_READ)
+            except (OSError, ValueError):
+                # Tệp rỗng hoặc hệ thống tệp không hỗ trợ mmap
+                mapped = None
+            if mapped is not None:
+                with mapped:
+                    h.update(mapped)
+                return h
+
+        buffer = bytearray(block_size)
+        view = memoryview(buffer)
+        try:
+            while True:
+                size = f.readinto(buffer)
+                if not size:
+                    break
+                h.update(view[:size])
+        finally:
+            view.release()
     return h
 
 
+HASH_ALGORITHMS = {
+    "sha256": hashlib.sha256,
+    "sha512": hashlib.sha512,
+    "sha3_256": hashlib.sha3_256,
+    "sha3_512": hashlib.sha3_512,
+    "blake2b": hashlib.blake2b,
+}
+
+HASH_LABELS = {
+    "sha256": "SHA-256",
+    "sha512": "SHA-512",
+    "sha3_256": "SHA3-256",
+    "sha3_512": "SHA3-512",
+    "blake2b": "BLAKE2b",
+}
+
+DEFAULT_HASH_ALGORITHM = "sha256"
+
+
+def new_hash(algorithm=DEFAULT_HASH_ALGORITHM):
+    """Tạo đối tượng băm theo tên thuật toán trong HASH_ALGORITHMS."""
+    try:
+        return HASH_ALGORITHMS[algorithm]()
+    except KeyError:
+        raise ValueError(f"Thuật toán băm không được hỗ trợ: {algorithm}") from None
+
+
+def hash_file_path(file_path, algorithm=DEFAULT_HASH_ALGORITHM):
+    """Tính giá trị băm (hexdigest) của nội dung tệp tại file_path."""
+    return update_hash_from_file(new_hash(algorithm), file_path).hexdigest()
+
+
+def format_signature(signature, algorithm=DEFAULT_HASH_ALGORITHM):
+    """Ghép tên thuật toán băm vào chữ ký: "sha512:1234..."."""
+    return f"{algorithm}:{signature}"
+
+
+def parse_signature(text):
+    """Tách chuỗi chữ ký thành (thuật toán, số nguyên).
+
+    Chữ ký không có tiền tố được coi là SHA-256 như trước đây. Tiền tố thuật toán
+    không nằm trong phần được ký: người nhận chỉ dùng nó để chọn cách băm lại tệp.
+    """
+    text = text.strip()
+    algorithm, sep, value = text.partition(":")
+    if not sep:
+        algorithm, value = DEFAULT_HASH_ALGORITHM, text
+    if algorithm not in HASH_ALGORITHMS:
+        raise ValueError(f"Thuật toán băm không được hỗ trợ: {algorithm}")
+    return algorithm, int(value)
+
+
+def benchmark_hash_algorithms(size=32 << 20, repeat=3):
+    """Đo thông lượng (MiB/s) của từng thuật toán băm trên máy hiện tại."""
+    data = memoryview(os.urandom(1 << 20))
+    blocks = max(1, size >> 20)
+    results = {}
+    for algorithm in HASH_ALGORITHMS:
+        best = float("inf")
+        for _ in range(repeat):
+            h = new_hash(algorithm)
+            start = time.perf_counter()
+            for _ in range(blocks):
+                h.update(data)
+            h.digest()
+            best = min(best, time.perf_counter() - start)
+        results[algorithm] = blocks / best if best else float("inf")
+    return results
+
+
+def recommend_hash_algorithm(results=None):
+    """Trả về thuật toán băm nhanh nhất theo kết quả benchmark_hash_algorithms."""
+    results = results or benchmark_hash_algorithms()
+    return max(results, key=results.get)
+
+
+def hash_algorithms_for_key(n):
+    """Các thuật toán băm có digest luôn nhỏ hơn modulus n (n = 0: chưa có khóa)."""
+    if not n:
+        return list(HASH_ALGORITHMS)
+    return [name for name in HASH_ALGORITHMS if new_hash(name).digest_size * 8 < n.bit_length()]
+
+
+def _small_primes(limit):
+    """Sàng Eratosthenes, trả về các số nguyên tố nhỏ hơn limit."""
+    sieve = bytearray([1]) * limit
+    sieve[0:2] = b"\x00\x00"
+    for i in range(2, math.isqrt(limit) + 1):
+        if sieve[i]:
+            sieve[i * i::i] = bytes(len(range(i * i, limit, i)))
+    return [i for i, flag in enumerate(sieve) if flag]
+
+
+SMALL_PRIMES = _small_primes(2000)
+
+# Bộ cơ sở Miller-Rabin tất định, đủ cho mọi n < 3.3 * 10^24 (bao phủ n < 2^64)
+DETERMINISTIC_BASES = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41)
+
+
+def _trial_division(n):
+    """Lọc sơ bộ: True nếu chắc chắn nguyên tố, False nếu hợp số, None nếu chưa rõ."""
+    for p in SMALL_PRIMES:
+        if n % p == 0:
+            return n == p
+        if p * p > n:
+            return True
+    return None
+
+
+def _miller_rabin(n, bases):
+    """Kiểm tra Miller-Rabin mạnh với các cơ sở cho trước."""
+    r, s = 0, n - 1
+    while s % 2 == 0:
+        r += 1
+        s //= 2
+
+    for a in bases:
+        a %= n
+        if a < 2:
+            continue
+        x = pow(a, s, n)
+        if x == 1 or x == n - 1:
+            continue
+        for _ in range(r - 1):
+            x = pow(x, 2, n)
+            if x == n - 1:
+                break
+        else:
+            return False
+    return True
+
+
+def _jacobi(a, n):
+    """Ký hiệu Jacobi (a/n) với n lẻ dương."""
+    a %= n
+    result = 1
+    while a:
+        while a % 2 == 0:
+            a //= 2
+            if n % 8 in (3, 5):
+                result = -result
+        a, n = n, a
+        if a % 4 == 3 and n % 4 == 3:
+            result = -result
+        a %= n
+    return result if n == 1 else 0
+
+
+def _strong_lucas(n):
+    """Kiểm tra Lucas mạnh với tham số Selfridge (phương pháp A)."""
+    root = math.isqrt(n)
+    if root * root == n:
+        return False
+
+    D = 5
+    while True:
+        j = _jacobi(D, n)
+        if j == -1:
+            break
+        if j == 0 and abs(D) != n:
+            return False
+        D = -D - 2 if D > 0 else -D + 2
+    P, Q = 1, (1 - D) // 4
+
+    d, s = n + 1, 0
+    while d % 2 == 0:
+        d //= 2
+        s += 1
+
+    U, V, Qk = 1, P, Q % n
+    for bit in bin(d)[3:]:
+        U = U * V % n
+        V = (V * V - 2 * Qk) % n
+        Qk = Qk * Qk % n
+        if bit == "1":
+            U, V = (P * U + V) % n, (D * U + P * V) % n
+            if U & 1:
+                U += n
+            if V & 1:
+                V += n
+            U >>= 1
+            V >>= 1
+            Qk = Qk * Q % n
+
+    if U == 0 or V == 0:
+        return True
+    for _ in range(s - 1):
+        V = (V * V - 2 * Qk) % n
+        if V == 0:
+            return True
+        Qk = Qk * Qk % n
+    return False
+
+
+def is_probable_prime(n, rounds=5, mode="auto"):
+    """Kiểm tra tính nguyên tố.
+
+    Lọc bằng chia thử các số nguyên tố nhỏ, sau đó:
+    - n < 2^64: Miller-Rabin với bộ cơ sở tất định (kết quả chính xác).
+    - mode "bpsw" hoặc n <= 128 bit (khóa 256 bit): Baillie-PSW.
+    - còn lại: cơ sở 2 rồi thêm rounds cơ sở ngẫu nhiên.
+    """
+    if n < 2:
+        return False
+    verdict = _trial_division(n)
+    if verdict is not None:
+        return verdict
+
+    if n < 1 << 64:
+        return _miller_rabin(n, DETERMINISTIC_BASES)
+    if mode == "bpsw" or n.bit_length() <= 128:
+        return _miller_rabin(n, (2,)) and _strong_lucas(n)
+    if not _miller_rabin(n, (2,)):
+        return False
+    return _miller_rabin(n, [random.randrange(3, n - 1) for _ in range(rounds)])
+
+
+class RSAKey:
+    """Khóa RSA gọn nhẹ gồm modulus n và số mũ (e hoặc d).
+
+    Có thể giải nén như tuple: n, e = public_key.
+    """
+
+    __slots__ = ("n", "exponent")
+
+    def __init__(self, n: int, exponent: int) -> None:
+        self.n = n
+        self.exponent = exponent
+
+    def __iter__(self):
+        yield self.n
+        yield self.exponent
+
+    def __eq__(self, other):
+        if isinstance(other, RSAKey):
+            return self.n == other.n and self.exponent == other.exponent
+        if isinstance(other, tuple) and len(other) == 2:
+            return (self.n, self.exponent) == other
+        return NotImplemented
+
+    def __hash__(self):
+        return hash((self.n, self.exponent))
+
+    def __repr__(self):
+        return f"RSAKey(n={self.n}, exponent={self.exponent})"
+
+    @property
+    def byte_length(self) -> int:
+        """Số byte cố định để lưu một chữ ký theo modulus này."""
+        return (self.n.bit_length() + 7) // 8
+
+
+class SignatureRecord:
+    """Một dòng manifest: đường dẫn, digest và chữ ký dạng bytes độ dài cố định."""
+
+    __slots__ = ("path", "digest", "signature")
+
+    def __init__(self, path: str, digest: bytes, signature: bytes) -> None:
+        self.path = path
+        self.digest = digest
+        self.signature = signature
+
+    def __repr__(self):
+        return f"SignatureRecord(path={self.path!r}, digest={bytes(self.digest).hex()})"
+
+
+class SignatureColumns:
+    """Lưu manifest theo cột: digest và chữ ký nằm liền nhau trong hai bytearray.
+
+    Mỗi phần tử được truy cập qua memoryview nên không tạo bản sao, kể cả khi
+    chuyển cho hashlib hoặc bước xác minh.
+    """
+
+    __slots__ = ("algorithm", "digest_size", "signature_size", "paths", "digests", "signatures")
+
+    def __init__(self, digest_size: int, signature_size: int, algorithm: str = DEFAULT_HASH_ALGORITHM) -> None:
+        self.algorithm = algorithm
+        self.digest_size = digest_size
+        self.signature_size = signature_size
+        self.paths = []
+        self.digests = bytearray()
+        self.signatures = bytearray()
+
+    def __len__(self):
+        return len(self.paths)
+
+    def append(self, path, digest, signature):
+        """Thêm một dòng; digest là bytes, signature là số nguyên hoặc bytes."""
+        if len(digest) != self.digest_size:
+            raise ValueError("Độ dài digest không khớp với manifest.")
+        if isinstance(signature, int):
+            signature = signature.to_bytes(self.signature_size, "big")
+        elif len(signature) != self.signature_size:
+            raise ValueError("Độ dài chữ ký không khớp với manifest.")
+        self.paths.append(path)
+        self.digests += digest
+        self.signatures += signature
+
+    def digest(self, index):
+        start = index * self.digest_size
+        return memoryview(self.digests)[start:start + self.digest_size]
+
+    def signature(self, index):
+        start = index * self.signature_size
+        return memoryview(self.signatures)[start:start + self.signature_size]
+
+    def record(self, index):
+        return SignatureRecord(self.paths[index], self.digest(index), self.signature(index))
+
+    def digest_ints(self):
+        view = memoryview(self.digests)
+        size = self.digest_size
+        for start in range(0, len(view), size):
+            yield int.from_bytes(view[start:start + size], "big")
+
+    def signature_ints(self):
+        view = memoryview(self.signatures)
+        size = self.signature_size
+        for start in range(0, len(view), size):
+            yield int.from_bytes(view[start:start + size], "big")
+
+    def verify(self, public_key):
+        """Xác minh toàn bộ manifest, trả về danh sách kết quả theo thứ tự dòng."""
+        return _verify_ints(self.digest_ints(), self.signature_ints(), public_key)
+
+
+def read_manifest_header(file_path):
+    """Đọc phần đầu manifest, trả về (thuật toán băm, RSAKey hoặc None).
+
+    Thuật toán là None nếu manifest không có dòng "# hash".
+    """
+    algorithm = public_key = None
+    with open(file_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if not line.startswith("#"):
+                break
+            fields = line.split()
+            if fields[1:2] == ["hash"] and len(fields) == 3:
+                algorithm = fields[2]
+            elif fields[1:2] == ["public"] and len(fields) == 4:
+                try:
+                    public_key = RSAKey(int(fields[2], 16), int(fields[3], 16))
+                except ValueError:
+                    public_key = None
+    return algorithm, public_key
+
+
+def load_manifest(file_path, public_key):
+    """Đọc manifest dạng "digest_hex signature_hex path" vào SignatureColumns.
+
+    Dòng đầu "# hash <thuật toán>" cho biết thuật toán băm, mặc định là SHA-256.
+    Nếu manifest ghi "# public <n> <e>" khác public_key thì báo ValueError.
+    """
+    public_key = RSAKey(*public_key)
+    signature_size = public_key.byte_length
+    columns = SignatureColumns(new_hash().digest_size, signature_size)
+    with open(file_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.rstrip("\n")
+            if line.startswith("# hash "):
+                algorithm = line[len("# hash "):].strip()
+                columns = SignatureColumns(new_hash(algorithm).digest_size, signature_size, algorithm)
+                continue
+            if line.startswith("# public "):
+                n_hex, e_hex = line[len("# public "):].split()
+                if RSAKey(int(n_hex, 16), int(e_hex, 16)) != public_key:
+                    raise ValueError("Manifest được ký bằng khóa công khai khác.")
+                continue
+            if not line or line.startswith("#"):
+                continue
+            digest_hex, signature_hex, path = line.split(" ", 2)
+            columns.append(path, bytes.fromhex(digest_hex), int(signature_hex, 16))
+    return columns
+
+
+def write_manifest(columns, file_path):
+    """Ghi SignatureColumns ra tệp manifest."""
+    with open(file_path, 'w', encoding='utf-8') as f:
+        f.write(f"# hash {columns.algorithm}\n")
+        for index, path in enumerate(columns.paths):
+            f.write(f"{columns.digest(index).hex()} {columns.signature(index).hex()} {path}\n")
+
+
+AUDIT_DB_PATH = os.path.join(os.path.expanduser("~"), ".digital_signature_audit.db")
+
+
+def key_fingerprint(key):
+    """Dấu vân tay ngắn (16 byte đầu của SHA-256) cho khóa (n, số mũ)."""
+    n, exponent = key
+    data = n.to_bytes((n.bit_length() + 7) // 8 or 1, "big") + exponent.to_bytes(
+        (exponent.bit_length() + 7) // 8 or 1, "big")
+    return hashlib.sha256(data).hexdigest()[:32]
+
+
+class AuditLog:
+    """Nhật ký kiểm toán chỉ ghi thêm, lưu trong SQLite ở chế độ WAL.
+
+    Các bản ghi được gom lại và ghi theo lô (đủ batch_size dòng, hoặc chậm nhất
+    max_delay giây sau bản ghi cũ nhất còn chờ); truy vấn phân trang theo id
+    (keyset) nên vẫn nhanh với hàng triệu dòng.
+    """
+
+    def __init__(self, db_path: str = AUDIT_DB_PATH, batch_size: int = 64, max_delay: float = 1.0) -> None:
+        self.batch_size = batch_size
+        self.max_delay = max_delay
+        self._pending = []
+        self._lock = threading.RLock()
+        self._timer = None
+        self.connection = sqlite3.connect(db_path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript("""
+            CREATE TABLE IF NOT EXISTS audit_log (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                timestamp REAL NOT NULL,
+                operation TEXT NOT NULL,
+                file_digest TEXT NOT NULL,
+                key_fingerprint TEXT NOT NULL,
+                result TEXT NOT NULL,
+                duration REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS audit_log_digest ON audit_log (file_digest);
+            CREATE INDEX IF NOT EXISTS audit_log_fingerprint ON audit_log (key_fingerprint);
+            CREATE TRIGGER IF NOT EXISTS audit_log_no_update BEFORE UPDATE ON audit_log
+            BEGIN SELECT RAISE(ABORT, 'audit_log chỉ cho phép ghi thêm'); END;
+            CREATE TRIGGER IF NOT EXISTS audit_log_no_delete BEFORE DELETE ON audit_log
+            BEGIN SELECT RAISE(ABORT, 'audit_log chỉ cho phép ghi thêm'); END;
+        """)
+
+    def record(self, operation, file_digest, fingerprint, result, duration):
+        """Thêm một bản ghi vào hàng đợi, ghi xuống đĩa khi đủ lô hoặc sau max_delay giây."""
+        with self._lock:
+            self._pending.append((time.time(), operation, file_digest, fingerprint, result, duration))
+            if len(self._pending) >= self.batch_size:
+                self.flush()
+            elif self._timer is None:
+                self._timer = threading.Timer(self.max_delay, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def flush(self):
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._pending:
+                return
+            with self.connection:
+                self.connection.executemany(
+                    "INSERT INTO audit_log (timestamp, operation, file_digest, key_fingerprint, result, duration) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    self._pending,
+                )
+            self._pending.clear()
+
+    @staticmethod
+    def _prefix_range(column, prefix):
+        """Điều kiện tiền tố dạng khoảng (column >= prefix AND column < prefix + U+10FFFF), dùng được chỉ mục."""
+        return f"({column} >= ? AND {column} < ?)", [prefix, prefix + "\U0010ffff"]
+
+    def query(self, before_id=None, limit=50, file_digest=None, fingerprint=None, search=None):
+        """Trả về tối đa limit bản ghi mới nhất có id < before_id.
+
+        file_digest và fingerprint lọc theo tiền tố; search khớp tiền tố của một trong hai.
+        """
+        self.flush()
+        conditions = []
+        params = []
+        if before_id is not None:
+            conditions.append("id < ?")
+            params.append(before_id)
+        for column, prefix in (("file_digest", file_digest), ("key_fingerprint", fingerprint)):
+            if prefix:
+                condition, values = self._prefix_range(column, prefix)
+                conditions.append(condition)
+                params.extend(values)
+        if search:
+            digest_condition, digest_values = self._prefix_range("file_digest", search)
+            key_condition, key_values = self._prefix_range("key_fingerprint", search)
+            conditions.append(f"({digest_condition} OR {key_condition})")
+            params.extend(digest_values + key_values)
+
+        sql = "SELECT id, timestamp, operation, file_digest, key_fingerprint, result, duration FROM audit_log"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += " ORDER BY id DESC LIMIT ?"
+        params.append(limit)
+        with self._lock:
+            return self.connection.execute(sql, params).fetchall()
+
+    def close(self):
+        with self._lock:
+            self.flush()
+            self.connection.close()
+
+
+def generate_key_pair(key_size=2048):
+    """Sinh cặp khóa RSA, trả về (public_key, private_key, (p, q))."""
+    while True:
+        p = Random_Prime(key_size=key_size).generate_rsa_keys()
+        q = Random_Prime(key_size=key_size).generate_rsa_keys()
+        if p == q:
+            continue
+        euler_n = (p - 1) * (q - 1)
+        e = choose_e(euler_n)
+        if e is None:
+            continue
+        d = mod_inverse(e, euler_n)
+        return RSAKey(p * q, e), RSAKey(p * q, d), (p, q)
+
+
+def save_key_file(file_path, public_key, private_key, primes):
+    """Lưu cặp khóa (dạng hex) ra tệp JSON chỉ chủ sở hữu đọc được."""
+    p, q = primes
+    data = {"n": f"{public_key.n:x}", "e": f"{public_key.exponent:x}",
+            "d": f"{private_key.exponent:x}", "p": f"{p:x}", "q": f"{q:x}"}
+    fd = os.open(file_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2)
+        f.write("\n")
+
+
+def load_key_file(file_path):
+    """Đọc tệp khóa do save_key_file ghi, trả về (public_key, private_key, (p, q))."""
+    with open(file_path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    try:
+        n, e, d, p, q = (int(data[name], 16) for name in ("n", "e", "d", "p", "q"))
+    except (KeyError, TypeError, ValueError) as exc:
+        raise ValueError(f"Tệp khóa không hợp lệ: {file_path}") from exc
+    if p * q != n:
+        raise ValueError(f"Tệp khóa không hợp lệ: {file_path}")
+    return RSAKey(n, e), RSAKey(n, d), (p, q)
+
+
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+INOTIFY_EVENT = struct.Struct("iIII")
+
+
+def _load_inotify():
+    """Nạp inotify từ libc qua ctypes; trả về None nếu hệ điều hành không hỗ trợ."""
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        libc.inotify_init1.argtypes = [ctypes.c_int]
+        libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        libc.inotify_rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+    except (OSError, AttributeError):
+        return None
+    return libc
+
+
+class FolderWatcher:
+    """Theo dõi một cây thư mục và tự động ký các tệp mới hoặc bị thay đổi.
+
+    Dùng inotify khi có, nếu không thì quét định kỳ và so sánh với chỉ mục
+    (mtime, size). Mỗi tệp chỉ được xử lý sau khi đứng yên debounce giây; việc
+    băm và ký chạy trong một nhóm luồng có giới hạn, kết quả được ghi thêm vào
+    manifest, manifest được xoay vòng khi vượt quá max_manifest_bytes.
+    """
+
+    def __init__(self, root, manifest_path, public_key, private_key, primes=None,
+                 algorithm=DEFAULT_HASH_ALGORITHM, workers=None, debounce=1.0,
+                 interval=2.0, max_manifest_bytes=64 << 20, backups=5,
+                 sign_existing=False, audit_log=None, hardened=False):
+        self.root = os.path.abspath(root)
+        self.manifest_path = os.path.abspath(manifest_path)
+        self.public_key = RSAKey(*public_key)
+        self.private_key = RSAKey(*private_key)
+        self.context = KeyContext.from_keys(self.public_key, self.private_key, primes)
+        self.signer = HardenedSigner(self.context) if hardened else self.context
+        self.algorithm = algorithm
+        self.debounce = debounce
+        self.interval = interval
+        self.max_manifest_bytes = max_manifest_bytes
+        self.backups = backups
+        self.sign_existing = sign_existing
+        self.audit_log = audit_log
+
+        self.workers = workers or os.cpu_count() or 1
+        self._slots = threading.BoundedSemaphore(self.workers * 2)
+        self._executor = ThreadPoolExecutor(max_workers=self.workers)
+        self._manifest_lock = threading.Lock()
+        self._stop = threading.Event()
+        # Được đặt khi watch và chỉ mục ban đầu đã sẵn sàng
+        self.ready = threading.Event()
+
+        # Chỉ mục: đường dẫn -> (mtime_ns, size) của lần ký gần nhất
+        self.index = {}
+        # Tệp đang chờ: đường dẫn -> (thời điểm thay đổi cuối, (mtime_ns, size))
+        self.pending = {}
+
+        self._inotify = _load_inotify()
+        self._fd = -1
+        self._watches = {}
+        # Thư mục không đặt được watch (ví dụ hết max_user_watches): quét định kỳ
+        self._unwatched = set()
+
+    @staticmethod
+    def _stat_key(path):
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        if not stat.S_ISREG(st.st_mode):
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def _is_manifest(self, path):
+        """Đúng với manifest và các bản xoay vòng manifest.N của nó."""
+        if path == self.manifest_path:
+            return True
+        prefix = self.manifest_path + "."
+        return path.startswith(prefix) and path[len(prefix):].isdigit()
+
+    def _walk(self, top):
+        """Duyệt cây thư mục bằng os.scandir, trả về (thư mục, tệp, (mtime_ns, size))."""
+        stack = [top]
+        while stack:
+            directory = stack.pop()
+            yield directory, None, None
+            try:
+                entries = os.scandir(directory)
+            except OSError:
+                continue
+            with entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        elif entry.is_file(follow_symlinks=False) and not self._is_manifest(entry.path):
+                            st = entry.stat(follow_symlinks=False)
+                            yield directory, entry.path, (st.st_mtime_ns, st.st_size)
+                    except OSError:
+                        continue
+
+    def _mark(self, path, key, now):
+        previous = self.pending.get(path)
+        if previous is None or previous[1] != key:
+            self.pending[path] = (now, key)
+
+    def scan(self, top=None, seed=False):
+        """Quét cây thư mục; seed=True chỉ nạp chỉ mục mà không ký."""
+        now = time.monotonic()
+        seen = set()
+        for directory, path, key in self._walk(top or self.root):
+            if path is None:
+                self._add_watch(directory)
+                continue
+            seen.add(path)
+            if seed:
+                self.index[path] = key
+            elif self.index.get(path) != key:
+                self._mark(path, key, now)
+
+        if not seed:
+            prefix = None if top is None else top + os.sep
+            for path in self.index.keys() - seen:
+                if prefix is None or path.startswith(prefix):
+                    del self.index[path]
+                    self.pending.pop(path, None)
+
+    def _add_watch(self, directory):
+        if self._fd < 0:
+            return
+        wd = self._inotify.inotify_add_watch(self._fd, os.fsencode(directory), WATCH_MASK)
+        if wd >= 0:
+            self._watches[wd] = directory
+            self._unwatched.discard(directory)
+            return
+        err = ctypes.get_errno()
+        if err == errno.ENOENT or directory in self._unwatched:
+            return
+        logger.warning("Không theo dõi được %s (%s), chuyển sang quét định kỳ thư mục này.",
+                       directory, os.strerror(err))
+        self._unwatched.add(directory)
+
+    def _forget(self, directory):
+        """Bỏ watch và chỉ mục của một thư mục đã bị xóa hoặc chuyển ra ngoài."""
+        prefix = directory + os.sep
+        for wd, watched in list(self._watches.items()):
+            if watched == directory or watched.startswith(prefix):
+                del self._watches[wd]
+                self._inotify.inotify_rm_watch(self._fd, wd)
+        self._unwatched = {d for d in self._unwatched if d != directory and not d.startswith(prefix)}
+        for path in [path for path in self.index if path.startswith(prefix)]:
+            del self.index[path]
+        for path in [path for path in self.pending if path.startswith(prefix)]:
+            del self.pending[path]
+
+    def _rescan_unwatched(self):
+        for directory in list(self._unwatched):
+            if os.path.isdir(directory):
+                self.scan(top=directory)
+            else:
+                self._forget(directory)
+
+    def _read_events(self):
+        """Đọc các sự kiện inotify và đánh dấu tệp cần xử lý."""
+        try:
+            data = os.read(self._fd, 1 << 16)
+        except BlockingIOError:
+            return
+        now = time.monotonic()
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = INOTIFY_EVENT.unpack_from(data, offset)
+            offset += INOTIFY_EVENT.size
+            name = data[offset:offset + length].rstrip(b"\0")
+            offset += length
+
+            if mask & IN_Q_OVERFLOW:
+                # Hàng đợi nhân bị tràn: quét lại toàn bộ cây
+                self.scan()
+                continue
+            if mask & IN_IGNORED:
+                # Nhân đã gỡ watch (thư mục bị xóa hoặc inotify_rm_watch)
+                self._watches.pop(wd, None)
+                continue
+            directory = self._watches.get(wd)
+            if directory is None or not name:
+                continue
+            path = os.path.join(directory, os.fsdecode(name))
+
+            if mask & IN_ISDIR:
+                if mask & (IN_CREATE | IN_MOVED_TO):
+                    self.scan(top=path)
+                elif mask & (IN_DELETE | IN_MOVED_FROM):
+                    self._forget(path)
+                continue
+            if self._is_manifest(path):
+                continue
+            if mask & (IN_DELETE | IN_MOVED_FROM):
+                self.index.pop(path, None)
+                self.pending.pop(path, None)
+                continue
+            key = self._stat_key(path)
+            if key is not None:
+                self._mark(path, key, now)
+
+    def _dispatch_ready(self):
+        """Gửi các tệp đã đứng yên đủ lâu sang nhóm luồng để băm và ký."""
+        now = time.monotonic()
+        ready = [path for path, (changed, _) in self.pending.items() if now - changed >= self.debounce]
+        for path in ready:
+            _, observed = self.pending.pop(path)
+            key = self._stat_key(path)
+            if key is None:
+                self.index.pop(path, None)
+                continue
+            if key != observed:
+                # Tệp vẫn đang được ghi
+                self.pending[path] = (now, key)
+                continue
+            if self.index.get(path) == key:
+                continue
+            self.index[path] = key
+            if "\n" in path or "\r" in path:
+                # Manifest ghi mỗi tệp trên một dòng
+                logger.warning("Bỏ qua tệp có ký tự xuống dòng trong tên: %r", path)
+                continue
+            self._slots.acquire()
+            future = self._executor.submit(self._sign_file, path)
+            future.add_done_callback(self._on_signed)
+
+    def _sign_file(self, path):
+        start = time.perf_counter()
+        h = update_hash_from_file(new_hash(self.algorithm), path)
+        digest = h.digest()
+        signature = self.signer.sign_int(digest_to_int(digest.hex(), self.context.n))
+        return path, digest, signature, time.perf_counter() - start
+
+    def _on_signed(self, future):
+        self._slots.release()
+        try:
+            path, digest, signature, duration = future.result()
+        except (OSError, ValueError) as exc:
+            logger.warning("Không ký được tệp: %s", exc)
+            return
+        size = self.public_key.byte_length
+        line = f"{digest.hex()} {signature.to_bytes(size, 'big').hex()} {os.path.relpath(path, self.root)}\n"
+        with self._manifest_lock:
+            self._rotate_manifest()
+            with open(self.manifest_path, 'a', encoding='utf-8') as f:
+                if f.tell() == 0:
+                    f.write(self._manifest_header())
+                f.write(line)
+            if self.audit_log is not None:
+                self.audit_log.record("sign", digest.hex(), self.context.fingerprint, "ok", duration)
+
+    def _manifest_header(self):
+        return f"# hash {self.algorithm}\n# public {self.public_key.n:x} {self.public_key.exponent:x}\n"
+
+    def _check_manifest_header(self):
+        """Xoay manifest cũ nếu phần đầu của nó không khớp khóa và thuật toán hiện tại."""
+        try:
+            if os.path.getsize(self.manifest_path) == 0:
+                return
+        except OSError:
+            return
+        try:
+            header = read_manifest_header(self.manifest_path)
+        except (OSError, UnicodeDecodeError):
+            header = None
+        if header == (self.algorithm, self.public_key):
+            return
+        logger.warning("Manifest %s dùng khóa hoặc thuật toán khác, chuyển sang manifest mới.",
+                       self.manifest_path)
+        self._rotate_manifest(force=True)
+
+    def _rotate_manifest(self, force=False):
+        try:
+            if not force and os.path.getsize(self.manifest_path) < self.max_manifest_bytes:
+                return
+        except OSError:
+            return
+        for index in range(self.backups - 1, 0, -1):
+            older = f"{self.manifest_path}.{index}"
+            if os.path.exists(older):
+                os.replace(older, f"{self.manifest_path}.{index + 1}")
+        os.replace(self.manifest_path, f"{self.manifest_path}.1")
+
+    def stop(self):
+        self._stop.set()
+
+    def run(self):
+        """Vòng lặp chính; chạy đến khi stop() được gọi."""
+        with self._manifest_lock:
+            self._check_manifest_header()
+        if self._inotify is not None:
+            self._fd = self._inotify.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        try:
+            self.scan(seed=not self.sign_existing)
+            self.ready.set()
+            next_scan = time.monotonic() + self.interval
+            while not self._stop.is_set():
+                timeout = self.debounce if self.pending else 1.0
+                if self._fd >= 0:
+                    readable, _, _ = select.select([self._fd], [], [], timeout)
+                    if readable:
+                        self._read_events()
+                    if self._unwatched and time.monotonic() >= next_scan:
+                        self._rescan_unwatched()
+                        next_scan = time.monotonic() + self.interval
+                else:
+                    self._stop.wait(min(timeout, max(0.0, next_scan - time.monotonic())))
+                    if time.monotonic() >= next_scan:
+                        self.scan()
+                        next_scan = time.monotonic() + self.interval
+                self._dispatch_ready()
+        finally:
+            self._executor.shutdown(wait=True)
+            if self._fd >= 0:
+                os.close(self._fd)
+                self._fd = -1
+
+
+
+def ask_file_path():
+    """Mở hộp thoại chọn tệp của tkinter.
+
+    tkinter chỉ được nạp ở đây để chế độ --watch và benchmark chạy được trên
+    máy không có giao diện đồ họa.
+    """
+    from tkinter.filedialog import askopenfilename
+
+    return askopenfilename(title="Chọn tệp", filetypes=[("All files", "*.*")])
+
+
+# Kích thước khóa giao diện cho chọn: khóa 256 bit không chứa vừa digest nào
+KEY_SIZES = (512, 1024, 2048, 4096)
+
 
 class KeysizeSelectScreen(ModalScreen[int]):
     DEFAULT_CSS = """
@@ -145,13 +1350,7 @@ class KeysizeSelectScreen(ModalScreen[int]):
     def compose(self) -> ComposeResult:
         with Vertical():
             yield Select(
-                options=[
-                    ("256", 256),
-                    ("512", 512),
-                    ("1024", 1024),
-                    ("2048", 2048),
-                    ("4096", 4096),
-                ],
+                options=[(str(size), size) for size in KEY_SIZES],
                 prompt="Chọn kích thước khóa",
                 id="keysize-select",
                 compact=True
@@ -230,6 +1429,211 @@ class ErrorMessageScreen(ModalScreen[None]):
         )
 
 
+def compact_value(value: str, width: int = 36) -> str:
+    """Dạng rút gọn của một giá trị dài để hiển thị trong ô một dòng.
+
+    - "(n,e)" / "(n,d)": dấu vân tay khóa và độ dài modulus.
+    - số thập phân: phần đầu…cuối ở dạng hex kèm số bit.
+    - "thuật_toán:chữ_ký": giữ tiền tố, rút gọn chữ ký như trên.
+    - chuỗi khác (digest hex): phần đầu…cuối.
+    """
+    if len(value) <= width:
+        return value
+
+    if value.startswith("(") and value.endswith(")"):
+        parts = value[1:-1].split(",")
+        if len(parts) == 2 and all(part.isdigit() for part in parts):
+            n, exponent = int(parts[0]), int(parts[1])
+            return f"fp {key_fingerprint((n, exponent))[:16]} ({n.bit_length()} bit)"
+
+    prefix, sep, rest = value.rpartition(":")
+    if sep and rest.isdigit():
+        return f"{prefix}:{compact_value(rest, width - len(prefix) - 1)}"
+
+    if value.isdigit():
+        number = int(value)
+        digits = format(number, "x")
+        half = max(4, (width - 14) // 2)
+        return f"0x{digits[:half]}…{digits[-half:]} ({number.bit_length()} bit)"
+
+    half = max(4, (width - 1) // 2)
+    return f"{value[:half]}…{value[-half:]}"
+
+
+class ValueDetailScreen(ModalScreen[None]):
+    DEFAULT_CSS = """
+    ValueDetailScreen {
+        align: center middle;
+        & > Vertical {
+            background: $background-lighten-1;
+            padding: 1 1;
+            width: 80%;
+            height: 70%;
+            border: round $primary;
+        }
+        #value-full {
+            width: 1fr;
+        }
+        #value-buttons {
+            width: 1fr;
+            height: auto;
+            align: center middle;
+        }
+    }
+    """
+
+    def __init__(self, title: str, value: str):
+        super().__init__()
+        self.title_text = title
+        self.value = value
+
+    def compose(self) -> ComposeResult:
+        with Vertical() as vertical:
+            vertical.border_title = self.title_text
+            with VerticalScroll():
+                yield Static(self.value, id="value-full", markup=False)
+            with Horizontal(id="value-buttons"):
+                yield Button("Sao Chép", id="copy")
+                yield Button("Đóng", id="close")
+
+    @on(Button.Pressed, "#copy")
+    def on_copy(self) -> None:
+        self.app.copy_to_clipboard(self.value)
+        self.notify("Đã Sao Chép")
+
+    @on(Button.Pressed, "#close")
+    def on_close(self) -> None:
+        self.dismiss(None)
+
+
+class ValueDisplay(Static):
+    """Ô hiển thị số lớn ở dạng rút gọn (hex hoặc dấu vân tay, xem compact_value).
+
+    Giá trị đầy đủ chỉ được dựng khi
+    người dùng bấm vào ô (hoặc Enter), phím c sao chép giá trị.
+    """
+
+    can_focus = True
+
+    BINDINGS = [
+        ("enter", "show_full", "Xem đầy đủ"),
+        ("c", "copy", "Sao chép"),
+    ]
+
+    PREVIEW_LENGTH = 36
+
+    def __init__(self, content: str = "", **kwargs):
+        super().__init__("", markup=False, **kwargs)
+        self.full_value = ""
+        if content:
+            self.update(content)
+
+    def preview(self) -> str:
+        return compact_value(self.full_value, self.PREVIEW_LENGTH)
+
+    def update(self, content="", **kwargs) -> None:
+        self.full_value = str(content)
+        super().update(self.preview(), **kwargs)
+
+    def on_click(self) -> None:
+        self.action_show_full()
+
+    def action_show_full(self) -> None:
+        if len(self.full_value) > self.PREVIEW_LENGTH:
+            self.app.push_screen(ValueDetailScreen(str(self.id), self.full_value))
+
+    def action_copy(self) -> None:
+        if self.full_value:
+            self.app.copy_to_clipboard(self.full_value)
+            self.notify("Đã Sao Chép")
+
+
+class HistoryScreen(ModalScreen[None]):
+    DEFAULT_CSS = """
+    HistoryScreen {
+        align: center middle;
+        & > Vertical {
+            background: $background-lighten-1;
+            padding: 1 1;
+            width: 90%;
+            height: 85%;
+            border: round $primary;
+        }
+        #history-filter {
+            width: 1fr;
+        }
+        #history-table {
+            height: 1fr;
+        }
+        #history-buttons {
+            width: 1fr;
+            height: auto;
+            align: center middle;
+        }
+    }
+    """
+
+    PAGE_SIZE = 100
+
+    def __init__(self, audit_log: AuditLog):
+        super().__init__()
+        self.audit_log = audit_log
+        self.last_id = None
+        self.filter_value = ""
+
+    def compose(self) -> ComposeResult:
+        with Vertical() as vertical:
+            vertical.border_title = "Lịch Sử"
+            yield Input(placeholder="Lọc theo phần đầu của digest hoặc dấu vân tay khóa", id="history-filter")
+            yield DataTable(id="history-table", cursor_type="row")
+            with Horizontal(id="history-buttons"):
+                yield Button("Tải Thêm", id="more")
+                yield Button("Đóng", id="close")
+
+    def on_mount(self) -> None:
+        table = self.query_one("#history-table", DataTable)
+        table.add_columns("ID", "Thời gian", "Thao tác", "Digest", "Khóa", "Kết quả", "Thời lượng (ms)")
+        self.load_page()
+
+    def load_page(self) -> None:
+        """Nạp thêm một trang bản ghi, bắt đầu sau dòng cuối đang hiển thị."""
+        value = self.filter_value
+        rows = self.audit_log.query(
+            before_id=self.last_id,
+            limit=self.PAGE_SIZE,
+            search=value or None,
+        )
+        table = self.query_one("#history-table", DataTable)
+        for row_id, timestamp, operation, file_digest, fingerprint, result, duration in rows:
+            table.add_row(
+                str(row_id),
+                time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(timestamp)),
+                operation,
+                file_digest[:16],
+                fingerprint[:16],
+                result,
+                f"{duration * 1000:.2f}",
+            )
+        if rows:
+            self.last_id = rows[-1][0]
+        self.query_one("#more", Button).disabled = len(rows) < self.PAGE_SIZE
+
+    @on(Input.Submitted, "#history-filter")
+    def on_filter_submitted(self, event: Input.Submitted) -> None:
+        self.filter_value = event.value.strip().lower()
+        self.last_id = None
+        self.query_one("#history-table", DataTable).clear()
+        self.load_page()
+
+    @on(Button.Pressed, "#more")
+    def on_more(self) -> None:
+        self.load_page()
+
+    @on(Button.Pressed, "#close")
+    def on_close(self) -> None:
+        self.dismiss(None)
+
+
 class Random_Prime:
     def __init__(self, key_size: int | None = None, min_val: int = 10, max_val: int = 100) -> None:
         self.min_val: int = min_val
@@ -238,31 +1642,8 @@ class Random_Prime:
 
     @staticmethod
     def is_prime(n, k=5):
-        """Kiểm tra số nguyên tố bằng thuật toán Miller-Rabin."""
-        if n < 2:
-            return False
-        if n == 2 or n == 3:
-            return True
-        if n % 2 == 0:
-            return False
-
-        r, s = 0, n - 1
-        while s % 2 == 0:
-            r += 1
-            s //= 2
-
-        for _ in range(k):
-            a = random.randrange(2, n - 1)
-            x = pow(a, s, n)
-            if x == 1 or x == n - 1:
-                continue
-            for _ in range(r - 1):
-                x = (x * x) % n
-                if x == n - 1:
-                    break
-            else:
-                return False
-        return True
+        """Kiểm tra số nguyên tố (chia thử, Miller-Rabin tất định hoặc Baillie-PSW)."""
+        return is_probable_prime(n, rounds=k)
 
     def generate_random_prime(self):
 
@@ -283,10 +1664,21 @@ class Random_Prime:
 
 class Apps(App):
 
-    def __init__(self):
+    def __init__(self, low_latency: bool = False, hash_algorithm: str = DEFAULT_HASH_ALGORITHM,
+                 hardened: bool = False, audit_log_path: str = AUDIT_DB_PATH):
         super().__init__()
-        self.public_key = (0, 0)
-        self.private_key = (0, 0)
+        self.low_latency = low_latency
+        self.hardened = hardened
+        self.signer = None
+        self.hash_algorithm = hash_algorithm
+        self.hash_algorithm_sender = hash_algorithm
+        self.hash_algorithm_receiver = hash_algorithm
+        # Các thuật toán đang có trong hai ô chọn thuật toán băm
+        self.hash_options = list(HASH_ALGORITHMS)
+        self.audit_log = AuditLog(audit_log_path)
+
+        self.public_key = RSAKey(0, 0)
+        self.private_key = RSAKey(0, 0)
 
         self.data_sender = ""
         self.data_receiver = ""
@@ -402,6 +1794,11 @@ class Apps(App):
         color: #00ffff;
     }
 
+    Button#btn5 {
+        border: round #C45AFF;
+        color: #C45AFF;
+    }
+
 
     Label#label-p {
         width: 36;
@@ -479,7 +1876,7 @@ class Apps(App):
 
 
     Horizontal#button-container {
-        width: 70;
+        width: auto;
         align: center middle;
     }
 
@@ -488,6 +1885,11 @@ class Apps(App):
         align: center bottom;
     }
 
+    Select#hash-sender, Select#hash-receiver {
+        width: 16;
+        margin: 1 1;
+    }
+
     Static#modulus-n {
         border: round $primary;
         height: 3;
@@ -606,6 +2008,7 @@ class Apps(App):
                             yield Button("Tính Toán", id="btn2")
                             yield Button("Làm Mới", id="btn3")
                             yield Button("Key Size", id="btn4")
+                            yield Button("Lịch Sử", id="btn5")
 
                     with Vertical(id="menu1") as vertical:
                         vertical.border_title = "Dữ Liệu"
@@ -613,27 +2016,27 @@ class Apps(App):
 
                         with Horizontal():
                             yield Label("Modulus n", id="modulus-n-label")
-                            yield Static("", id="modulus-n")
+                            yield ValueDisplay("", id="modulus-n")
 
                         with Horizontal():
                             yield Label("φ(n)", id="euler-n-label")
-                            yield Static("", id="euler-n")
+                            yield ValueDisplay("", id="euler-n")
 
                         with Horizontal():
                             yield Label("Số mũ công khai e", id="public-e-label")
-                            yield Static("", id="public-e")
+                            yield ValueDisplay("", id="public-e")
 
                         with Horizontal():
                             yield Label("Số mũ bí mật d", id="private-d-label")
-                            yield Static("", id="private-d")
+                            yield ValueDisplay("", id="private-d")
 
                         with Horizontal():
                             yield Label("Khóa Public (n,e)", id="key-public-n-e-label")
-                            yield Static("", id="key-public-n-e")
+                            yield ValueDisplay("", id="key-public-n-e")
 
                         with Horizontal():
                             yield Label("Khóa Private (n,d)", id="key-private-n-d-label")
-                            yield Static("", id="key-private-n-d")
+                            yield ValueDisplay("", id="key-private-n-d")
 
                 with Vertical(id="users"):
                     with Vertical():
@@ -644,14 +2047,21 @@ class Apps(App):
                                 yield Static("", id="upload_file_sender")
 
                             with Horizontal():
-                                yield Label("[b]SHA-256[/]", id="sender-sha-256")
-                                yield Static("", id="sha-256-sender")
+                                yield Label(f"[b]{HASH_LABELS[self.hash_algorithm]}[/]", id="sender-sha-256")
+                                yield ValueDisplay("", id="sha-256-sender")
 
                             with Horizontal():
                                 yield Label("[b]Chữ ký số[/]", id="sender-signature-label")
-                                yield Static("", id="signature-sender")
+                                yield ValueDisplay("", id="signature-sender")
 
                             with Horizontal(id="button-receiver"):
+                                yield Select(
+                                    options=[(label, name) for name, label in HASH_LABELS.items()],
+                                    value=self.hash_algorithm,
+                                    allow_blank=False,
+                                    id="hash-sender",
+                                    compact=True
+                                )
                                 yield Button("[b]Băm (HASH)[/]", id="btn1-sender")
                                 yield Button("[b]Ký Số[/]", id="btn2-sender")
 
@@ -663,14 +2073,21 @@ class Apps(App):
                                 yield Static("", id="upload_file_receiver")
 
                             with Horizontal():
-                                yield Label("SHA-256", id="receiver-sha-256")
-                                yield Static("", id="sha-256-receiver")
+                                yield Label(HASH_LABELS[self.hash_algorithm], id="receiver-sha-256")
+                                yield ValueDisplay("", id="sha-256-receiver")
 
                             with Horizontal():
                                 yield Label("[b]Chữ ký số[/]", id="receiver-signature-label")
                                 yield Input("", id="input-signature")
 
                             with Horizontal(id="button-receiver"):
+                                yield Select(
+                                    options=[(label, name) for name, label in HASH_LABELS.items()],
+                                    value=self.hash_algorithm,
+                                    allow_blank=False,
+                                    id="hash-receiver",
+                                    compact=True
+                                )
                                 yield Button("[b]Băm (HASH)[/]", id="btn1-receiver")
                                 yield Button("[b]Xác Minh[/]", id="btn4-receiver")
 
@@ -679,11 +2096,12 @@ class Apps(App):
         if event.button.id == "btn1":
             event.button.styles.animate("opacity", value=0.2, duration=0.5)
 
+            # Số nguyên tố hai chữ số cho modulus quá nhỏ để ký: sinh p, q cho khóa nhỏ nhất trong KEY_SIZES
             input_p = self.query_one("#input-p", Input)
-            input_p.value = str(Random_Prime().generate_random_prime())
+            input_p.value = str(Random_Prime(key_size=KEY_SIZES[0]).generate_rsa_keys())
 
             input_q = self.query_one("#input-q", Input)
-            input_q.value = str(Random_Prime().generate_random_prime())
+            input_q.value = str(Random_Prime(key_size=KEY_SIZES[0]).generate_rsa_keys())
 
 
 
@@ -699,6 +2117,12 @@ class Apps(App):
                         int(input_q_value)
                         ) is False:
                     self.push_screen(ErrorMessageScreen(message="Tham số không phải là số nguyên tố.", id_css="error-message"))
+                elif not hash_algorithms_for_key(int(input_p_value) * int(input_q_value)):
+                    bits = (int(input_p_value) * int(input_q_value)).bit_length()
+                    self.push_screen(ErrorMessageScreen(
+                        message=f"Modulus n chỉ có {bits} bit, không nhỏ hơn digest của thuật toán băm nào "
+                                "nên không ký được. Hãy chọn p, q lớn hơn.",
+                        id_css="error-message"))
                 else:
                     modulus_n = int(input_q_value) * int(input_p_value)
                     euler_n = (int(input_q_value) - 1) * (int(input_p_value) - 1)
@@ -714,8 +2138,13 @@ class Apps(App):
                     self.query_one("#key-public-n-e", Static).update(str(f"({modulus_n},{e})"))
                     self.query_one("#key-private-n-d", Static).update(str(f"({modulus_n},{d})"))
 
-                    self.public_key = (modulus_n, e)
-                    self.private_key = (modulus_n, d)
+                    self.public_key = RSAKey(modulus_n, e)
+                    self.private_key = RSAKey(modulus_n, d)
+                    self.update_hash_options()
+                    if self.hardened:
+                        self.signer = HardenedSigner(KeyContext.from_keys(
+                            self.public_key, self.private_key, (int(input_p_value), int(input_q_value))
+                        ))
             else:
                 self.push_screen(ErrorMessageScreen(message="Tham số không hợp lệ. Vui lòng kiểm tra lại !", id_css="error-message"))
 
@@ -739,8 +2168,9 @@ class Apps(App):
 
             self.query_one("#input-signature", Input).value = ""
 
-            self.public_key = (0, 0)
-            self.private_key = (0, 0)
+            self.public_key = RSAKey(0, 0)
+            self.private_key = RSAKey(0, 0)
+            self.signer = None
 
             self.data_sender = ""
             self.data_receiver = ""
@@ -750,6 +2180,8 @@ class Apps(App):
 
             self.data_sign_sender = ""
 
+            self.update_hash_options()
+
             self.notify("Làm Mới Thành Công")
 
         elif event.button.id == "btn4":
@@ -757,21 +2189,21 @@ class Apps(App):
 
             self.push_screen(KeysizeSelectScreen(), callback=self.on_keysize_selected)
 
+        elif event.button.id == "btn5":
+            event.button.styles.animate("opacity", value=0.2, duration=0.5)
+
+            self.push_screen(HistoryScreen(self.audit_log))
 
         elif event.button.id == "btn_upload_file_sender":
             event.button.styles.animate("opacity", value=0.2, duration=0.5)
 
-            file_path = askopenfilename(
-                title="Chọn tệp",
-                filetypes=[("All files", "*.*")]
-            )
+            file_path = ask_file_path()
 
             if file_path:
                 self.query_one("#upload_file_sender", Static).update(
                     f"{file_path}"
                 )
-                with open(file_path, 'rb') as f:
-                    self.data_sender = f.read()
+                self.data_sender = file_path
 
                 self.notify("Tải Tệp Lên Thành Công")
             else:
@@ -781,7 +2213,7 @@ class Apps(App):
             event.button.styles.animate("opacity", value=0.2, duration=0.5)
 
             if self.data_sender != "":
-                self.data_hash_sender = hash_file_256(message=str(self.data_sender))
+                self.data_hash_sender = hash_file_path(self.data_sender, self.hash_algorithm_sender)
                 self.query_one("#sha-256-sender", Static).update(
                     f"{self.data_hash_sender}"
                 )
@@ -792,32 +2224,49 @@ class Apps(App):
         elif event.button.id == "btn2-sender":
             event.button.styles.animate("opacity", value=0.2, duration=0.5)
 
-            self.data_sign_sender = sign_message(self.private_key, self.data_hash_sender)
+            if self.data_hash_sender == "":
+                self.push_screen(ErrorMessageScreen(message="Vui Lòng Băm Tệp Trước", id_css="error-message"))
+                event.button.styles.animate("opacity", value=1.0, duration=0.2)
+                return
+
+            start = time.perf_counter()
+            try:
+                if self.signer is not None:
+                    self.data_sign_sender = self.signer.sign_hashes([self.data_hash_sender])[0]
+                else:
+                    self.data_sign_sender = sign_message(self.private_key, self.data_hash_sender)
+            except ValueError as exc:
+                self.audit_log.record(
+                    "sign", self.data_hash_sender, key_fingerprint(self.public_key),
+                    "error", time.perf_counter() - start
+                )
+                self.push_screen(ErrorMessageScreen(message=str(exc), id_css="error-message"))
+                event.button.styles.animate("opacity", value=1.0, duration=0.2)
+                return
+            self.audit_log.record(
+                "sign", self.data_hash_sender, key_fingerprint(self.public_key),
+                "ok", time.perf_counter() - start
+            )
             self.query_one("#signature-sender", Static).update(
-                f"{self.data_sign_sender}"
+                format_signature(self.data_sign_sender, self.hash_algorithm_sender)
             )
 
         elif event.button.id == "btn_upload_file_receiver":
             event.button.styles.animate("opacity", value=0.2, duration=0.5)
 
-            file_path = askopenfilename(
-                title="Chọn tệp",
-                filetypes=[("All files", "*.*")]
-            )
+            file_path = ask_file_path()
 
             if file_path:
                 self.query_one("#upload_file_receiver", Static).update(
                     f"{file_path}"
                 )
-
-                with open(file_path, 'rb') as f:
-                    self.data_receiver = f.read()
+                self.data_receiver = file_path
 
         elif event.button.id == "btn1-receiver":
             event.button.styles.animate("opacity", value=0.2, duration=0.5)
 
             if self.data_receiver != "":
-                self.data_hash_receiver = hash_file_256(message=str(self.data_receiver))
+                self.data_hash_receiver = hash_file_path(self.data_receiver, self.hash_algorithm_receiver)
                 self.query_one("#sha-256-receiver", Static).update(
                     f"{self.data_hash_receiver}"
                 )
@@ -828,10 +2277,32 @@ class Apps(App):
         elif event.button.id == "btn4-receiver":
             event.button.styles.animate("opacity", value=0.2, duration=0.5)
 
-            input_signature = int(self.query_one("#input-signature", Input).value)
+            try:
+                algorithm, input_signature = parse_signature(self.query_one("#input-signature", Input).value)
+            except ValueError:
+                self.audit_log.record(
+                    "verify", self.data_hash_receiver, key_fingerprint(self.public_key), "malformed", 0.0
+                )
+                self.push_screen(ErrorMessageScreen(message="Chữ ký không hợp lệ", id_css="error-message"))
+                event.button.styles.animate("opacity", value=1.0, duration=0.2)
+                return
+
+            if algorithm != self.hash_algorithm_receiver and self.data_receiver != "":
+                # Chữ ký ghi kèm thuật toán băm khác: băm lại tệp theo thuật toán đó
+                self.hash_algorithm_receiver = algorithm
+                self.query_one("#hash-receiver", Select).value = algorithm
+                self.query_one("#receiver-sha-256", Label).update(HASH_LABELS[algorithm])
+                self.data_hash_receiver = hash_file_path(self.data_receiver, algorithm)
+                self.query_one("#sha-256-receiver", Static).update(self.data_hash_receiver)
+
+            start = time.perf_counter()
             is_valid = verify_signature(
                 hash256=self.data_hash_receiver,
                 signature=input_signature, public_key=self.public_key)
+            self.audit_log.record(
+                "verify", self.data_hash_receiver, key_fingerprint(self.public_key),
+                "valid" if is_valid else "invalid", time.perf_counter() - start
+            )
 
             if is_valid:
                 self.push_screen(ErrorMessageScreen(message="Xác Minh Chữ Ký Hợp Lệ", id_css="correct-message"))
@@ -841,6 +2312,54 @@ class Apps(App):
 
         event.button.styles.animate("opacity", value=1.0, duration=0.2)
 
+    def update_hash_options(self) -> None:
+        """Chỉ cho chọn các thuật toán băm có digest vừa với modulus của khóa hiện tại.
+
+        Bước Tính Toán từ chối khóa không vừa thuật toán nào, nên danh sách không rỗng.
+        Select.Changed do set_options gây ra bị chặn: digest đã băm chỉ bị xóa khi
+        thuật toán đang chọn không còn được phép.
+        """
+        allowed = hash_algorithms_for_key(self.public_key.n)
+        if allowed == self.hash_options:
+            return
+        self.hash_options = allowed
+        options = [(HASH_LABELS[name], name) for name in allowed]
+        for select_id, current, select_algorithm in (
+                ("#hash-sender", self.hash_algorithm_sender, self.select_sender_algorithm),
+                ("#hash-receiver", self.hash_algorithm_receiver, self.select_receiver_algorithm)):
+            value = current if current in allowed else allowed[0]
+            select = self.query_one(select_id, Select)
+            with self.prevent(Select.Changed):
+                select.set_options(options)
+                select.value = value
+            select_algorithm(value)
+
+    def select_sender_algorithm(self, algorithm: str) -> None:
+        if algorithm == self.hash_algorithm_sender:
+            return
+        self.hash_algorithm_sender = algorithm
+        self.query_one("#sender-sha-256", Label).update(f"[b]{HASH_LABELS[algorithm]}[/]")
+        self.data_hash_sender = ""
+        self.data_sign_sender = ""
+        self.query_one("#sha-256-sender", Static).update(str())
+        self.query_one("#signature-sender", Static).update(str())
+
+    def select_receiver_algorithm(self, algorithm: str) -> None:
+        if algorithm == self.hash_algorithm_receiver:
+            return
+        self.hash_algorithm_receiver = algorithm
+        self.query_one("#receiver-sha-256", Label).update(HASH_LABELS[algorithm])
+        self.data_hash_receiver = ""
+        self.query_one("#sha-256-receiver", Static).update(str())
+
+    @on(Select.Changed, "#hash-sender")
+    def on_hash_sender_changed(self, event: Select.Changed) -> None:
+        self.select_sender_algorithm(event.value)
+
+    @on(Select.Changed, "#hash-receiver")
+    def on_hash_receiver_changed(self, event: Select.Changed) -> None:
+        self.select_receiver_algorithm(event.value)
+
     def on_mount(self) -> None:
         self.register_theme(galaxy_theme)
         self.theme = "galaxy"
@@ -851,7 +2370,14 @@ class Apps(App):
             "modulus-n", "euler-n", "public-e", "private-d", "key-public-n-e", "key-private-n-d"
         ]
 
-        for _ in range(1, 5):
+        if self.low_latency:
+            # Bỏ qua hiệu ứng khởi động, đặt thẳng kích thước cuối
+            self.query_one("#menu1", Vertical).styles.height = 27
+            self.query_one("#sender", Vertical).styles.height = 20
+            self.query_one("#receiver", Vertical).styles.height = 21
+            return
+
+        for _ in range(1, 6):
             button_container = self.query_one(f"#btn{_}", Button)
             button_container.styles.opacity = 0
             button_container.styles.animate("opacity", value=1.0, duration=1.5)
@@ -901,5 +2427,65 @@ class Apps(App):
 
 
 if __name__ == "__main__":
-    app = Apps()
-    app.run()
+    parser = argparse.ArgumentParser(description="Chữ ký số RSA trên giao diện dòng lệnh.")
+    parser.add_argument("--low-latency", action="store_true", help="Bỏ qua hiệu ứng khởi động")
+    parser.add_argument("--hash", choices=sorted(HASH_ALGORITHMS), default=DEFAULT_HASH_ALGORITHM,
+                        help="Thuật toán băm mặc định")
+    parser.add_argument("--bench-hash", action="store_true",
+                        help="Đo thông lượng các thuật toán băm và đề xuất thuật toán nhanh nhất")
+    parser.add_argument("--watch", metavar="DIR", help="Theo dõi thư mục và tự động ký tệp mới hoặc thay đổi")
+    parser.add_argument("--manifest", default="signatures.manifest", help="Tệp manifest ghi chữ ký (chế độ --watch)")
+    parser.add_argument("--key", default="signing.key",
+                        help="Tệp khóa (chế độ --watch); tạo mới với --keysize nếu chưa có")
+    parser.add_argument("--keysize", type=int, default=2048, help="Kích thước khóa mới (chế độ --watch)")
+    parser.add_argument("--workers", type=int, default=None, help="Số luồng băm và ký (chế độ --watch)")
+    parser.add_argument("--sign-existing", action="store_true", help="Ký cả các tệp đã có khi bắt đầu theo dõi")
+    parser.add_argument("--hardened", action="store_true",
+                        help="Ký với làm mù và lũy thừa cửa sổ cố định (chậm hơn, chống tấn công thời gian)")
+    args = parser.parse_args()
+
+    if args.watch:
+        if os.path.exists(args.key):
+            try:
+                public_key, private_key, primes = load_key_file(args.key)
+            except (OSError, ValueError) as exc:
+                parser.error(str(exc))
+        else:
+            # p, q của generate_key_pair cho modulus ngắn nhất args.keysize - 1 bit
+            if args.hash not in hash_algorithms_for_key(1 << (args.keysize - 2)):
+                parser.error(f"Digest của {args.hash} dài hơn khóa {args.keysize} bit.")
+            public_key, private_key, primes = generate_key_pair(args.keysize)
+            save_key_file(args.key, public_key, private_key, primes)
+            print(f"Đã tạo khóa mới: {args.key}")
+        if args.hash not in hash_algorithms_for_key(public_key.n):
+            parser.error(f"Digest của {args.hash} dài hơn khóa {public_key.n.bit_length()} bit.")
+        audit_log = AuditLog()
+        watcher = FolderWatcher(
+            args.watch, args.manifest, public_key, private_key, primes=primes,
+            algorithm=args.hash, workers=args.workers, sign_existing=args.sign_existing,
+            audit_log=audit_log, hardened=args.hardened,
+        )
+        # SIGTERM (systemd, docker stop) dừng như Ctrl+C để nhật ký và nhóm luồng được đóng
+        signal.signal(signal.SIGTERM, lambda signum, frame: watcher.stop())
+        print(f"Khóa công khai: n={public_key.n:x} e={public_key.exponent:x}")
+        print(f"Dấu vân tay: {key_fingerprint(public_key)}")
+        try:
+            watcher.run()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            audit_log.close()
+        raise SystemExit(0)
+
+    if args.bench_hash:
+        results = benchmark_hash_algorithms()
+        for name, rate in sorted(results.items(), key=lambda item: -item[1]):
+            print(f"{HASH_LABELS[name]:<10} {rate:10.1f} MiB/s")
+        print(f"Đề xuất: {recommend_hash_algorithm(results)}")
+        raise SystemExit(0)
+
+    app = Apps(low_latency=args.low_latency, hash_algorithm=args.hash, hardened=args.hardened)
+    try:
+        app.run()
+    finally:
+        app.audit_log.close()
@@ -0,0 +1,399 @@
+import argparse
+import asyncio
+import hashlib
+import math
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+
+from concurrent.futures import ProcessPoolExecutor
+
+from basic_signature import (
+    KeyContext,
+    KeyPool,
+    HASH_LABELS,
+    HardenedSigner,
+    benchmark_hash_algorithms,
+    RSAKey,
+    SignatureColumns,
+    hash_file_path,
+    is_probable_prime,
+    recommend_hash_algorithm,
+    Random_Prime,
+    mod_inverse,
+    mod_pow,
+    sign_many,
+    sign_message,
+    verify_many,
+    verify_signature,
+)
+
+
+def make_key(key_size, e):
+    """Sinh cặp khóa RSA với số mũ công khai e cố định."""
+    while True:
+        p = Random_Prime(key_size=key_size).generate_rsa_keys()
+        q = Random_Prime(key_size=key_size).generate_rsa_keys()
+        if p == q:
+            continue
+        phi = (p - 1) * (q - 1)
+        if math.gcd(e, phi) != 1:
+            continue
+        d = mod_inverse(e, phi)
+        return p, q, (p * q, e), (p * q, d)
+
+
+def make_digests(count):
+    return [hashlib.sha256(str(i).encode("utf-8")).hexdigest() for i in range(count)]
+
+
+def report(name, count, elapsed):
+    rate = count / elapsed if elapsed else float("inf")
+    print(f"{name:<40} {count:>8} ops  {elapsed:8.3f} s  {rate:12.1f} ops/s")
+
+
+def bench_verify(key_size, count):
+    """So sánh xác minh qua mod_pow, pow dựng sẵn và verify_signature/verify_many."""
+    print(f"== Xác minh chữ ký, khóa {key_size} bit ==")
+    digests = make_digests(count)
+
+    for e in (3, 5, 17, 257, 65537):
+        _, _, public_key, private_key = make_key(key_size, e)
+        signatures = [sign_message(private_key, h) for h in digests]
+        n = public_key[0]
+
+        start = time.perf_counter()
+        for h, s in zip(digests, signatures):
+            assert int(h, 16) % n == mod_pow(s, e, n)
+        report(f"e={e} mod_pow", count, time.perf_counter() - start)
+
+        start = time.perf_counter()
+        for h, s in zip(digests, signatures):
+            assert int(h, 16) % n == pow(s, e, n)
+        report(f"e={e} pow (builtin)", count, time.perf_counter() - start)
+
+        start = time.perf_counter()
+        for h, s in zip(digests, signatures):
+            assert verify_signature(h, s, public_key)
+        report(f"e={e} verify_signature", count, time.perf_counter() - start)
+
+        start = time.perf_counter()
+        assert all(verify_many(digests, signatures, public_key))
+        report(f"e={e} verify_many", count, time.perf_counter() - start)
+
+
+def bench_sign(key_size, count):
+    """So sánh sign_message tuần tự với sign_many (CRT, nhiều tiến trình)."""
+    print(f"== Ký hàng loạt, khóa {key_size} bit ==")
+    digests = make_digests(count)
+    p, q, _, private_key = make_key(key_size, 65537)
+
+    start = time.perf_counter()
+    expected = [sign_message(private_key, h) for h in digests]
+    report("sign_message", count, time.perf_counter() - start)
+
+    start = time.perf_counter()
+    assert sign_many(private_key, digests, processes=1) == expected
+    report("sign_many processes=1", count, time.perf_counter() - start)
+
+    cpu = os.cpu_count() or 1
+    for processes in sorted({1, 2, 4, cpu}):
+        if processes > cpu:
+            continue
+        start = time.perf_counter()
+        assert sign_many(private_key, digests, primes=(p, q), processes=processes) == expected
+        report(f"sign_many CRT processes={processes}", count, time.perf_counter() - start)
+
+
+def drop_page_cache(file_path):
+    """Cố gắng loại tệp khỏi page cache để đo trường hợp đọc nguội."""
+    if not hasattr(os, "posix_fadvise"):
+        return False
+    with open(file_path, "rb") as f:
+        os.fsync(f.fileno())
+        os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_DONTNEED)
+    return True
+
+
+def bench_file(key_size, count):
+    """So sánh đọc toàn bộ tệp bằng read() với đường mmap của hash_file_path."""
+    size_mb = max(1, count // 10)
+    print(f"== Băm tệp {size_mb} MiB ==")
+
+    def read_all(file_path):
+        with open(file_path, "rb") as f:
+            return hashlib.sha256(f.read()).hexdigest()
+
+    with tempfile.NamedTemporaryFile(delete=False) as f:
+        block = os.urandom(1 << 20)
+        for _ in range(size_mb):
+            f.write(block)
+        file_path = f.name
+
+    try:
+        for cache in ("nóng", "nguội"):
+            for name, func in (("read()", read_all), ("hash_file_path", hash_file_path)):
+                if cache == "nóng":
+                    func(file_path)
+                elif not drop_page_cache(file_path):
+                    continue
+                start = time.perf_counter()
+                digest = func(file_path)
+                elapsed = time.perf_counter() - start
+                print(f"{name + ' (' + cache + ')':<40} {size_mb / elapsed:12.1f} MiB/s  {digest[:16]}")
+    finally:
+        os.remove(file_path)
+
+
+def bench_manifest(key_size, count):
+    """So sánh bộ nhớ giữa list tuple (path, hexdigest, int) và SignatureColumns."""
+    print(f"== Bộ nhớ manifest, khóa {key_size} bit ==")
+    _, _, public_key, private_key = make_key(key_size, 65537)
+    public_key = RSAKey(*public_key)
+    digests = make_digests(min(count, 200))
+    signatures = [sign_message(private_key, h) for h in digests]
+    total = count * 50
+
+    # Mỗi dòng có chuỗi digest và số nguyên chữ ký riêng như khi đọc từ tệp manifest
+    lines = [f"{digests[i % len(digests)]} {signatures[i % len(signatures)]:x} build/file_{i}.bin"
+             for i in range(total)]
+
+    tracemalloc.start()
+    rows = []
+    for line in lines:
+        digest_hex, signature_hex, path = line.split(" ", 2)
+        rows.append((path, digest_hex, int(signature_hex, 16)))
+    tuple_bytes = tracemalloc.get_traced_memory()[0]
+    del rows
+    tracemalloc.stop()
+
+    tracemalloc.start()
+    columns = SignatureColumns(32, public_key.byte_length)
+    for line in lines:
+        digest_hex, signature_hex, path = line.split(" ", 2)
+        columns.append(path, bytes.fromhex(digest_hex), int(signature_hex, 16))
+    column_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    print(f"{'tuple (path, hex, int)':<40} {total:>8} dòng  {tuple_bytes / total:10.1f} B/dòng")
+    print(f"{'SignatureColumns':<40} {total:>8} dòng  {column_bytes / total:10.1f} B/dòng")
+
+    start = time.perf_counter()
+    assert all(columns.verify(public_key))
+    report("SignatureColumns.verify", total, time.perf_counter() - start)
+
+
+def legacy_is_prime(n, k=5):
+    """Bản Miller-Rabin cũ: 5 cơ sở ngẫu nhiên, bình phương bằng (x * x) % n."""
+    if n < 2:
+        return False
+    if n == 2 or n == 3:
+        return True
+    if n % 2 == 0:
+        return False
+    r, s = 0, n - 1
+    while s % 2 == 0:
+        r += 1
+        s //= 2
+    for _ in range(k):
+        a = random.randrange(2, n - 1)
+        x = pow(a, s, n)
+        if x == 1 or x == n - 1:
+            continue
+        for _ in range(r - 1):
+            x = (x * x) % n
+            if x == n - 1:
+                break
+        else:
+            return False
+    return True
+
+
+def bench_prime(key_size, count):
+    """Số phép kiểm tra nguyên tố mỗi giây theo kích thước bit."""
+    print("== Kiểm tra nguyên tố ==")
+    for bits in (32, 64, 128, 256, 512, 1024):
+        candidates = [random.getrandbits(bits) | 1 | (1 << (bits - 1)) for _ in range(count)]
+        primes = []
+        while len(primes) < max(1, count // 50):
+            n = random.getrandbits(bits) | 1 | (1 << (bits - 1))
+            if is_probable_prime(n):
+                primes.append(n)
+
+        for name, func in (("legacy", legacy_is_prime), ("is_probable_prime", is_probable_prime)):
+            start = time.perf_counter()
+            for n in candidates:
+                func(n)
+            report(f"{bits} bit ngẫu nhiên {name}", count, time.perf_counter() - start)
+
+            start = time.perf_counter()
+            for n in primes:
+                func(n)
+            report(f"{bits} bit nguyên tố {name}", len(primes), time.perf_counter() - start)
+
+
+def bench_hash(key_size, count):
+    """Thông lượng từng thuật toán băm và đề xuất thuật toán nhanh nhất."""
+    size_mb = max(1, count // 10)
+    print(f"== Thuật toán băm, {size_mb} MiB ==")
+    results = benchmark_hash_algorithms(size=size_mb << 20)
+    for name, rate in sorted(results.items(), key=lambda item: -item[1]):
+        print(f"{HASH_LABELS[name]:<40} {rate:12.1f} MiB/s")
+    print(f"Đề xuất: {recommend_hash_algorithm(results)}")
+
+
+def _rebuild_sign_task(task):
+    """Tác vụ không chia sẻ ngữ cảnh: dựng lại KeyContext cho mỗi lần ký."""
+    public_key, private_key, primes, hashes = task
+    return KeyContext.from_keys(public_key, private_key, primes).sign_hashes(hashes)
+
+
+def _rebuild_verify_task(task):
+    """Tác vụ không chia sẻ ngữ cảnh: dựng lại KeyContext cho mỗi lần xác minh."""
+    public_key, hashes, signatures = task
+    return KeyContext.from_keys(public_key).verify_pairs(hashes, signatures)
+
+
+def bench_context(key_size, count):
+    """Chi phí mỗi tác vụ khi dựng lại khóa so với ngữ cảnh chia sẻ qua initializer."""
+    print(f"== Ngữ cảnh khóa dùng chung, khóa {key_size} bit ==")
+    p, q, public_key, private_key = make_key(key_size, 65537)
+    primes = (p, q)
+    digests = make_digests(min(count, 500))
+    signatures = [sign_message(private_key, h) for h in digests]
+    processes = max(2, os.cpu_count() or 1)
+
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        list(executor.map(_rebuild_verify_task, [(public_key, digests[:1], signatures[:1])] * processes))
+
+        start = time.perf_counter()
+        tasks = [(public_key, private_key, primes, [h]) for h in digests]
+        assert [s for part in executor.map(_rebuild_sign_task, tasks) for s in part] == signatures
+        elapsed = time.perf_counter() - start
+        print(f"{'sign_message, dựng lại mỗi tác vụ':<40} {elapsed / len(digests) * 1e6:12.1f} µs/tác vụ")
+
+        start = time.perf_counter()
+        tasks = [(public_key, [h], [s]) for h, s in zip(digests, signatures)]
+        assert all(r for part in executor.map(_rebuild_verify_task, tasks) for r in part)
+        elapsed = time.perf_counter() - start
+        print(f"{'verify_signature, dựng lại mỗi tác vụ':<40} {elapsed / len(digests) * 1e6:12.1f} µs/tác vụ")
+
+    context = KeyContext.from_keys(public_key, private_key, primes)
+    with KeyPool(context, processes, chunk_size=1) as pool:
+        pool.verify(digests[:processes + 1], signatures[:processes + 1])
+
+        start = time.perf_counter()
+        assert pool.sign(digests) == signatures
+        elapsed = time.perf_counter() - start
+        print(f"{'sign_message, KeyPool dùng chung':<40} {elapsed / len(digests) * 1e6:12.1f} µs/tác vụ")
+
+        start = time.perf_counter()
+        assert all(pool.verify(digests, signatures))
+        elapsed = time.perf_counter() - start
+        print(f"{'verify_signature, KeyPool dùng chung':<40} {elapsed / len(digests) * 1e6:12.1f} µs/tác vụ")
+
+
+def bench_hardened(key_size, count):
+    """Chi phí của chế độ ký an toàn (làm mù + cửa sổ cố định) so với đường nhanh."""
+    print(f"== Ký an toàn, khóa {key_size} bit ==")
+    p, q, public_key, private_key = make_key(key_size, 65537)
+    digests = make_digests(min(count, 500))
+    n = public_key[0]
+    expected = [sign_message(private_key, h) for h in digests]
+
+    for name, context in (
+        ("CRT", KeyContext.from_keys(public_key, private_key, (p, q))),
+        ("không CRT", KeyContext.from_keys(public_key, private_key)),
+    ):
+        start = time.perf_counter()
+        assert [context.sign_int(int(h, 16) % n) for h in digests] == expected
+        fast = time.perf_counter() - start
+        report(f"đường nhanh {name}", len(digests), fast)
+
+        signer = HardenedSigner(context)
+        start = time.perf_counter()
+        assert signer.sign_hashes(digests) == expected
+        hardened = time.perf_counter() - start
+        report(f"an toàn {name}", len(digests), hardened)
+        print(f"{'chi phí chế độ an toàn ' + name:<40} {hardened / fast:12.2f} x")
+
+
+def bench_render(key_size, count):
+    """Thời gian vẽ lần đầu và vẽ lại khung Dữ Liệu với giá trị khóa lớn."""
+    from textual.widgets import Static
+
+    from basic_signature import Apps, ValueDisplay
+
+    print(f"== Giao diện, khóa {key_size} bit ==")
+    p, q, public_key, private_key = make_key(key_size, 65537)
+    n, e = public_key
+    d = private_key[1]
+    values = {
+        "modulus-n": str(n),
+        "euler-n": str((p - 1) * (q - 1)),
+        "public-e": str(e),
+        "private-d": str(d),
+        "key-public-n-e": f"({n},{e})",
+        "key-private-n-d": f"({n},{d})",
+    }
+    rounds = max(1, count // 100)
+
+    async def measure(low_latency, audit_log_path):
+        # Nhật ký kiểm toán tạm, không ghi vào ~/.digital_signature_audit.db
+        app = Apps(low_latency=low_latency, audit_log_path=audit_log_path)
+        start = time.perf_counter()
+        async with app.run_test(size=(200, 60)) as pilot:
+            await pilot.pause()
+            await pilot.wait_for_scheduled_animations()
+            first_paint = time.perf_counter() - start
+
+            redraw = {}
+            # Static.update vẽ toàn bộ chuỗi thập phân như trước đây
+            for name, update in (("Static (đầy đủ)", Static.update), ("ValueDisplay", ValueDisplay.update)):
+                start = time.perf_counter()
+                for _ in range(rounds):
+                    for widget_id, value in values.items():
+                        update(app.query_one(f"#{widget_id}", Static), value)
+                    await pilot.pause()
+                redraw[name] = (time.perf_counter() - start) / rounds
+        app.audit_log.close()
+        return first_paint, redraw
+
+    for low_latency in (False, True):
+        with tempfile.TemporaryDirectory() as directory:
+            first_paint, redraw = asyncio.run(measure(low_latency, os.path.join(directory, "audit.db")))
+        mode = "low-latency" if low_latency else "mặc định"
+        print(f"{'vẽ lần đầu, ' + mode:<40} {first_paint * 1000:12.1f} ms")
+        for name, elapsed in redraw.items():
+            print(f"{'vẽ lại ' + name + ', ' + mode:<40} {elapsed * 1000:12.1f} ms")
+
+
+BENCHMARKS = {
+    "verify": bench_verify,
+    "sign": bench_sign,
+    "file": bench_file,
+    "manifest": bench_manifest,
+    "prime": bench_prime,
+    "hash": bench_hash,
+    "context": bench_context,
+    "hardened": bench_hardened,
+    "render": bench_render,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Đo hiệu năng các thao tác chữ ký số.")
+    parser.add_argument("--key-size", type=int, default=2048)
+    parser.add_argument("--count", type=int, default=2000)
+    parser.add_argument("--only", choices=sorted(BENCHMARKS), action="append")
+    args = parser.parse_args()
+
+    random.seed(0)
+    for name in args.only or BENCHMARKS:
+        BENCHMARKS[name](args.key_size, args.count)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,681 @@
+import asyncio
+import ctypes
+import errno
+import hashlib
+import os
+import shutil
+import signal
+import sqlite3
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("textual")
+
+from textual.app import App, ComposeResult
+from textual.widgets import Button, Input, Select
+
+import basic_signature as bs
+
+
+# Khóa cố định từ hai số nguyên tố Mersenne (n dài 1128 bit): dựng tức thì và tất định.
+P, Q = 2 ** 521 - 1, 2 ** 607 - 1
+E = 65537
+D = pow(E, -1, (P - 1) * (Q - 1))
+PUBLIC_KEY = (P * Q, E)
+PRIVATE_KEY = (P * Q, D)
+
+
+def digests(count, algorithm="sha256"):
+    return [hashlib.new(algorithm, str(i).encode()).hexdigest() for i in range(count)]
+
+
+# Xác minh chữ ký
+
+def test_verify_signature():
+    digest, other = digests(2)
+    signature = bs.sign_message(PRIVATE_KEY, digest)
+    assert bs.verify_signature(digest, signature, PUBLIC_KEY)
+    assert not bs.verify_signature(digest, signature + 1, PUBLIC_KEY)
+    assert not bs.verify_signature(other, signature, PUBLIC_KEY)
+
+
+def test_verify_many_keeps_order():
+    hashes = digests(6)
+    signatures = [bs.sign_message(PRIVATE_KEY, h) for h in hashes]
+    signatures[2] += 1
+    assert bs.verify_many(hashes, signatures, PUBLIC_KEY) == [True, True, False, True, True, True]
+
+
+# Ký hàng loạt
+
+def test_crt_params():
+    p, q, dp, dq, q_inv = bs.crt_params(P, Q, D)
+    assert (p, q) == (Q, P)
+    assert (dp, dq) == (D % (Q - 1), D % (P - 1))
+    assert q * q_inv % p == 1
+
+
+def test_sign_many_matches_sign_message():
+    hashes = digests(20)
+    expected = [bs.sign_message(PRIVATE_KEY, h) for h in hashes]
+    assert bs.sign_many(PRIVATE_KEY, hashes, processes=1) == expected
+    assert bs.sign_many(PRIVATE_KEY, hashes, primes=(P, Q), processes=2, chunk_size=3) == expected
+    assert bs.verify_many(hashes, expected, PUBLIC_KEY) == [True] * len(hashes)
+
+
+# Băm tệp
+
+# Tệp rỗng không mmap được nên đi theo nhánh readinto như pipe
+@pytest.mark.parametrize("size", [0, 1, 4096, 3 * 4096 + 5])
+def test_update_hash_from_file_matches_hashlib(tmp_path, size):
+    data = os.urandom(size)
+    path = tmp_path / "data.bin"
+    path.write_bytes(data)
+    h = bs.update_hash_from_file(hashlib.sha256(), path, block_size=4096)
+    assert h.digest() == hashlib.sha256(data).digest()
+    assert bs.hash_file_path(path) == hashlib.sha256(data).hexdigest()
+
+
+@pytest.mark.skipif(not hasattr(os, "mkfifo"), reason="cần os.mkfifo")
+def test_update_hash_from_file_reads_pipes(tmp_path):
+    data = os.urandom(3 * 4096 + 5)
+    path = tmp_path / "pipe"
+    os.mkfifo(path)
+    writer = threading.Thread(target=path.write_bytes, args=(data,))
+    writer.start()
+    h = bs.update_hash_from_file(hashlib.sha256(), path, block_size=4096)
+    writer.join()
+    assert h.digest() == hashlib.sha256(data).digest()
+
+
+# Khóa gọn và manifest
+
+def test_rsa_key():
+    key = bs.RSAKey(*PUBLIC_KEY)
+    n, e = key
+    assert (n, e) == PUBLIC_KEY
+    assert key == bs.RSAKey(*PUBLIC_KEY)
+    assert key == PUBLIC_KEY
+    assert key != bs.RSAKey(n, D)
+    assert key != 5
+    assert len({key, bs.RSAKey(*PUBLIC_KEY)}) == 1
+    assert key.byte_length == 141
+    assert not hasattr(key, "__dict__")
+
+
+def test_signature_columns_rejects_wrong_sizes():
+    columns = bs.SignatureColumns(32, 141)
+    with pytest.raises(ValueError):
+        columns.append("a", bytes(31), 1)
+    with pytest.raises(ValueError):
+        columns.append("a", bytes(32), bytes(140))
+
+
+@pytest.mark.parametrize("algorithm", ["sha256", "sha512"])
+def test_manifest_round_trip(tmp_path, algorithm):
+    hashes = digests(5, algorithm)
+    columns = bs.SignatureColumns(bs.new_hash(algorithm).digest_size,
+                                  bs.RSAKey(*PUBLIC_KEY).byte_length, algorithm)
+    for index, digest_hex in enumerate(hashes):
+        columns.append(f"dir/file {index}.bin", bytes.fromhex(digest_hex),
+                       bs.sign_message(PRIVATE_KEY, digest_hex))
+    path = tmp_path / "signatures.manifest"
+    bs.write_manifest(columns, path)
+
+    loaded = bs.load_manifest(path, PUBLIC_KEY)
+    assert loaded.algorithm == algorithm
+    assert loaded.paths == columns.paths
+    assert loaded.digests == columns.digests
+    assert loaded.signatures == columns.signatures
+    assert loaded.verify(PUBLIC_KEY) == [True] * len(hashes)
+    record = loaded.record(1)
+    assert record.path == "dir/file 1.bin"
+    assert bytes(record.digest).hex() == hashes[1]
+
+
+def test_load_manifest_without_header_is_sha256(tmp_path):
+    digest_hex = digests(1)[0]
+    path = tmp_path / "old.manifest"
+    path.write_text(f"{digest_hex} {bs.sign_message(PRIVATE_KEY, digest_hex):x} a.txt\n")
+    loaded = bs.load_manifest(path, PUBLIC_KEY)
+    assert loaded.algorithm == "sha256"
+    assert loaded.verify(PUBLIC_KEY) == [True]
+
+
+# Nhật ký kiểm toán
+
+@pytest.fixture
+def audit_log(tmp_path):
+    audit_log = bs.AuditLog(str(tmp_path / "audit.db"))
+    yield audit_log
+    audit_log.close()
+
+
+def count_audit_rows(db_path):
+    connection = sqlite3.connect(db_path)
+    try:
+        return connection.execute("SELECT COUNT(*) FROM audit_log").fetchone()[0]
+    finally:
+        connection.close()
+
+
+def test_audit_log_writes_in_batches(tmp_path):
+    db_path = str(tmp_path / "audit.db")
+    hashes = digests(5)
+    audit_log = bs.AuditLog(db_path, batch_size=4)
+    try:
+        for digest_hex in hashes[:3]:
+            audit_log.record("sign", digest_hex, "ab" * 16, "ok", 0.001)
+        assert count_audit_rows(db_path) == 0
+        audit_log.record("sign", hashes[3], "ab" * 16, "ok", 0.001)
+        assert count_audit_rows(db_path) == 4
+        audit_log.record("sign", hashes[4], "ab" * 16, "ok", 0.001)
+        assert count_audit_rows(db_path) == 4
+    finally:
+        audit_log.close()
+    assert count_audit_rows(db_path) == 5
+
+
+def test_audit_log_flushes_after_max_delay(tmp_path):
+    db_path = str(tmp_path / "audit.db")
+    audit_log = bs.AuditLog(db_path, batch_size=64, max_delay=0.1)
+    try:
+        audit_log.record("sign", digests(1)[0], "ab" * 16, "ok", 0.001)
+        deadline = time.monotonic() + 5
+        while count_audit_rows(db_path) == 0 and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert count_audit_rows(db_path) == 1
+    finally:
+        audit_log.close()
+
+
+def test_audit_log_is_append_only(audit_log):
+    audit_log.record("sign", digests(1)[0], "ab" * 16, "ok", 0.001)
+    audit_log.flush()
+    with pytest.raises(sqlite3.DatabaseError):
+        audit_log.connection.execute("UPDATE audit_log SET result = 'fail'")
+    with pytest.raises(sqlite3.DatabaseError):
+        audit_log.connection.execute("DELETE FROM audit_log")
+
+
+def test_audit_log_query_pages_by_id(audit_log):
+    hashes = digests(10)
+    for index, digest_hex in enumerate(hashes):
+        audit_log.record("sign", digest_hex, ("ab" if index < 5 else "cd") * 16, "ok", 0.001)
+    pages = []
+    before_id = None
+    while page := audit_log.query(before_id=before_id, limit=4):
+        pages.append([row[3] for row in page])
+        before_id = page[-1][0]
+    assert pages == [hashes[9:5:-1], hashes[5:1:-1], hashes[1::-1]]
+    assert [row[3] for row in audit_log.query(file_digest=hashes[3])] == [hashes[3]]
+    assert [row[3] for row in audit_log.query(fingerprint="cd" * 16)] == hashes[9:4:-1]
+
+
+def test_audit_log_prefix_search(audit_log):
+    hashes = digests(10)
+    for index, digest_hex in enumerate(hashes):
+        audit_log.record("verify", digest_hex, ("ab" if index < 5 else "cd") * 16, "ok", 0.001)
+    assert [row[3] for row in audit_log.query(file_digest=hashes[3][:12])] == [hashes[3]]
+    assert len(audit_log.query(fingerprint="cdcd")) == 5
+    assert [row[3] for row in audit_log.query(search=hashes[7][:12])] == [hashes[7]]
+    assert [row[4] for row in audit_log.query(search="abab")] == ["ab" * 16] * 5
+
+
+def run_app(tmp_path, scenario, **kwargs):
+    """Chạy Apps không giao diện, nhật ký kiểm toán nằm trong tmp_path."""
+    async def main():
+        app = bs.Apps(low_latency=True, audit_log_path=str(tmp_path / "audit.db"), **kwargs)
+        try:
+            async with app.run_test(size=(200, 60)) as pilot:
+                await scenario(app, pilot)
+        finally:
+            app.audit_log.close()
+
+    asyncio.run(main())
+
+
+async def press(pilot, button_id):
+    pilot.app.query_one(f"#{button_id}", Button).press()
+    await pilot.pause()
+
+
+async def compute_keys(pilot, p=P, q=Q):
+    pilot.app.query_one("#input-p", Input).value = str(p)
+    pilot.app.query_one("#input-q", Input).value = str(q)
+    await press(pilot, "btn2")
+
+
+def test_app_uses_given_audit_log(tmp_path):
+    data = tmp_path / "data.bin"
+    data.write_bytes(b"data")
+
+    async def scenario(app, pilot):
+        await compute_keys(pilot)
+        app.data_sender = str(data)
+        await press(pilot, "btn1-sender")
+        await press(pilot, "btn2-sender")
+        assert app.data_sign_sender == bs.sign_message(app.private_key, app.data_hash_sender)
+
+    run_app(tmp_path, scenario)
+    assert count_audit_rows(str(tmp_path / "audit.db")) == 1
+
+
+def test_app_audits_failed_attempts(tmp_path):
+    n = (2 ** 127 - 1) * (2 ** 89 - 1)
+    d = pow(E, -1, (2 ** 127 - 2) * (2 ** 89 - 2))
+
+    async def scenario(app, pilot):
+        # Khóa nhỏ hơn digest: bước ký báo lỗi
+        app.public_key, app.private_key = bs.RSAKey(n, E), bs.RSAKey(n, d)
+        app.data_hash_sender = digests(1, "sha512")[0]
+        await press(pilot, "btn2-sender")
+        app.pop_screen()
+        app.query_one("#input-signature", Input).value = "sha512:không-phải-số"
+        await press(pilot, "btn4-receiver")
+        rows = app.audit_log.query()
+        assert [(row[2], row[5]) for row in rows] == [("verify", "malformed"), ("sign", "error")]
+        assert rows[1][3] == app.data_hash_sender
+
+    run_app(tmp_path, scenario)
+
+
+# Hiển thị giá trị dài
+
+class ValueDisplayApp(App):
+    def __init__(self, value):
+        super().__init__()
+        self.value = value
+
+    def compose(self) -> ComposeResult:
+        yield bs.ValueDisplay(self.value, id="value")
+
+
+def test_value_display_expands_on_enter():
+    value = str(PUBLIC_KEY[0])
+
+    async def scenario():
+        app = ValueDisplayApp(value)
+        async with app.run_test() as pilot:
+            display = app.query_one(bs.ValueDisplay)
+            assert display.full_value == value
+            assert display.preview() == bs.compact_value(value, bs.ValueDisplay.PREVIEW_LENGTH)
+            display.focus()
+            await pilot.press("enter")
+            assert isinstance(app.screen, bs.ValueDetailScreen)
+            assert app.screen.value == value
+
+    asyncio.run(scenario())
+
+
+def test_value_display_keeps_short_values():
+    async def scenario():
+        app = ValueDisplayApp("12345")
+        async with app.run_test() as pilot:
+            display = app.query_one(bs.ValueDisplay)
+            assert display.preview() == "12345"
+            display.focus()
+            await pilot.press("enter")
+            assert not isinstance(app.screen, bs.ValueDetailScreen)
+
+    asyncio.run(scenario())
+
+
+def test_compact_value():
+    n_hex = format(PUBLIC_KEY[0], "x")
+    digest = digests(1)[0]
+    assert bs.compact_value("12345") == "12345"
+    assert bs.compact_value(str(PUBLIC_KEY[0])) == f"0x{n_hex[:11]}…{n_hex[-11:]} (1128 bit)"
+    assert bs.compact_value(f"({PUBLIC_KEY[0]},{E})") == f"fp {bs.key_fingerprint(PUBLIC_KEY)[:16]} (1128 bit)"
+    assert bs.compact_value(f"sha512:{PUBLIC_KEY[0]}").startswith("sha512:0x")
+    assert bs.compact_value(digest) == f"{digest[:17]}…{digest[-17:]}"
+
+
+# Kiểm tra tính nguyên tố
+
+def test_is_probable_prime_matches_sieve():
+    primes = bs._small_primes(20000)
+    assert [n for n in range(20000) if bs.is_probable_prime(n)] == primes
+
+
+@pytest.mark.parametrize("n", [
+    561, 1105, 1729, 2047, 3215031751, 3825123056546413051,
+    318665857834031151167461,  # giả nguyên tố mạnh theo các cơ sở 2..37
+    2 ** 64 + 1, (2 ** 61 - 1) * (2 ** 31 - 1), P * Q,
+])
+def test_is_probable_prime_rejects_composites(n):
+    assert not bs.is_probable_prime(n)
+    assert not bs.is_probable_prime(n, mode="bpsw")
+
+
+@pytest.mark.parametrize("n", [2 ** 61 - 1, 2 ** 89 - 1, 2 ** 127 - 1, P, Q])
+def test_is_probable_prime_accepts_primes(n):
+    assert bs.is_probable_prime(n)
+    assert bs.is_probable_prime(n, mode="bpsw")
+    assert bs.Random_Prime.is_prime(n)
+
+
+# Thuật toán băm
+
+@pytest.mark.parametrize("algorithm", sorted(bs.HASH_ALGORITHMS))
+def test_hash_file_path_uses_registry(tmp_path, algorithm):
+    data = os.urandom(10000)
+    path = tmp_path / "data.bin"
+    path.write_bytes(data)
+    assert bs.hash_file_path(path, algorithm) == hashlib.new(algorithm, data).hexdigest()
+
+
+def test_signature_prefix():
+    assert bs.parse_signature(bs.format_signature(1234, "sha512")) == ("sha512", 1234)
+    assert bs.parse_signature(" 1234 ") == (bs.DEFAULT_HASH_ALGORITHM, 1234)
+    with pytest.raises(ValueError):
+        bs.parse_signature("md5:1234")
+    with pytest.raises(ValueError):
+        bs.new_hash("md5")
+
+
+def test_digest_not_smaller_than_modulus_is_rejected():
+    n = (2 ** 127 - 1) * (2 ** 89 - 1)
+    private_key = (n, pow(E, -1, (2 ** 127 - 2) * (2 ** 89 - 2)))
+    digest = digests(1, "sha512")[0]
+    with pytest.raises(ValueError):
+        bs.sign_message(private_key, digest)
+    with pytest.raises(ValueError):
+        bs.sign_many(private_key, [digest], processes=1)
+    assert not bs.verify_signature(digest, int(digest, 16) % n, (n, E))
+    assert bs.verify_many([digest], [int(digest, 16) % n], (n, E)) == [False]
+
+
+def test_hash_algorithms_for_key():
+    assert bs.hash_algorithms_for_key(0) == list(bs.HASH_ALGORITHMS)
+    assert bs.hash_algorithms_for_key(PUBLIC_KEY[0]) == list(bs.HASH_ALGORITHMS)
+    assert "sha512" not in bs.hash_algorithms_for_key(2 ** 511 + 1)
+    assert "sha256" in bs.hash_algorithms_for_key(2 ** 511 + 1)
+    assert bs.hash_algorithms_for_key(2 ** 255 + 1) == []
+
+
+@pytest.mark.parametrize("size", bs.KEY_SIZES)
+def test_offered_key_sizes_can_sign(size):
+    # generate_rsa_keys cho p, q trong [2^(size/2 - 1), 2^(size/2)): n ngắn nhất có size - 1 bit
+    assert bs.hash_algorithms_for_key(1 << (size - 2))
+
+
+def test_app_refuses_keys_too_small_to_sign(tmp_path):
+    async def scenario(app, pilot):
+        await compute_keys(pilot, 61, 53)
+        assert isinstance(app.screen, bs.ErrorMessageScreen)
+        assert app.public_key == (0, 0)
+        app.pop_screen()
+
+        await press(pilot, "btn1")
+        await compute_keys(pilot, app.query_one("#input-p", Input).value, app.query_one("#input-q", Input).value)
+        assert not isinstance(app.screen, bs.ErrorMessageScreen)
+        assert bs.hash_algorithms_for_key(app.public_key.n)
+
+    run_app(tmp_path, scenario)
+
+
+def test_app_keeps_digest_when_keys_are_recomputed(tmp_path):
+    data = tmp_path / "data.bin"
+    data.write_bytes(b"data")
+
+    async def scenario(app, pilot):
+        await compute_keys(pilot)
+        app.data_sender = str(data)
+        await press(pilot, "btn1-sender")
+        await press(pilot, "btn2-sender")
+        digest, signature = app.data_hash_sender, app.data_sign_sender
+        assert digest == hashlib.sha512(b"data").hexdigest()
+
+        await compute_keys(pilot)
+        assert (app.data_hash_sender, app.data_sign_sender) == (digest, signature)
+        assert app.query_one("#sha-256-sender", bs.ValueDisplay).full_value == digest
+
+        # Khóa 512 bit không còn cho chọn SHA-512: digest cũ phải bị xóa
+        small_p, small_q = bs.generate_key_pair(512)[2]
+        await compute_keys(pilot, small_p, small_q)
+        assert app.hash_algorithm_sender != "sha512"
+        assert app.data_hash_sender == ""
+        assert app.query_one("#hash-sender", Select).value == app.hash_algorithm_sender
+
+    run_app(tmp_path, scenario, hash_algorithm="sha512")
+
+
+# Theo dõi thư mục
+
+def run_watcher(watcher, action, expected_rows):
+    """Chạy watcher trong một luồng, gọi action rồi chờ manifest có đủ dòng."""
+    thread = threading.Thread(target=watcher.run)
+    thread.start()
+    try:
+        assert watcher.ready.wait(10)
+        action()
+        deadline = time.monotonic() + 10
+        while time.monotonic() < deadline:
+            try:
+                with open(watcher.manifest_path, encoding="utf-8") as f:
+                    rows = [line for line in f if not line.startswith("#")]
+            except OSError:
+                rows = []
+            if len(rows) >= expected_rows:
+                break
+            time.sleep(0.05)
+    finally:
+        watcher.stop()
+        thread.join()
+
+
+def make_watcher(root, manifest, **kwargs):
+    kwargs.setdefault("primes", (P, Q))
+    return bs.FolderWatcher(root, manifest, PUBLIC_KEY, PRIVATE_KEY,
+                            debounce=0.1, interval=0.2, **kwargs)
+
+
+@pytest.mark.parametrize("use_inotify", [True, False])
+def test_folder_watcher_signs_new_files(tmp_path, use_inotify):
+    root = tmp_path / "root"
+    root.mkdir()
+    (root / "existing.txt").write_text("old")
+    manifest = root / "signatures.manifest"
+    watcher = make_watcher(root, manifest, algorithm="sha512", workers=2)
+    if not use_inotify:
+        watcher._inotify = None
+
+    def action():
+        (root / "sub" / "deep").mkdir(parents=True)
+        for i in range(5):
+            (root / "sub" / "deep" / f"f{i}.bin").write_bytes(os.urandom(100))
+
+    run_watcher(watcher, action, 5)
+    columns = bs.load_manifest(manifest, PUBLIC_KEY)
+    assert columns.algorithm == "sha512"
+    assert sorted(columns.paths) == [os.path.join("sub", "deep", f"f{i}.bin") for i in range(5)]
+    assert all(columns.verify(PUBLIC_KEY))
+    for index, path in enumerate(columns.paths):
+        assert columns.digest(index) == hashlib.sha512((root / path).read_bytes()).digest()
+
+
+def test_folder_watcher_sign_existing(tmp_path):
+    root = tmp_path / "root"
+    root.mkdir()
+    (root / "existing.txt").write_text("old")
+    manifest = tmp_path / "signatures.manifest"
+    run_watcher(make_watcher(root, manifest, sign_existing=True), lambda: None, 1)
+    assert bs.load_manifest(manifest, PUBLIC_KEY).paths == ["existing.txt"]
+
+
+def test_generate_key_pair():
+    public_key, private_key, (p, q) = bs.generate_key_pair(512)
+    assert public_key.n == private_key.n == p * q
+    digest = digests(1)[0]
+    assert bs.verify_signature(digest, bs.sign_message(private_key, digest), public_key)
+
+
+def test_key_file_round_trip(tmp_path):
+    keys = bs.generate_key_pair(512)
+    path = tmp_path / "signing.key"
+    bs.save_key_file(path, *keys)
+    assert os.stat(path).st_mode & 0o777 == 0o600
+    assert bs.load_key_file(path) == keys
+
+
+def test_folder_watcher_rotates_manifest_of_another_key(tmp_path):
+    root = tmp_path / "root"
+    root.mkdir()
+    manifest = tmp_path / "signatures.manifest"
+    old_public, old_private, old_primes = bs.generate_key_pair(512)
+    old_watcher = bs.FolderWatcher(root, manifest, old_public, old_private, primes=old_primes,
+                                   debounce=0.1, interval=0.2)
+    run_watcher(old_watcher, lambda: (root / "k0").write_text("0"), 1)
+    run_watcher(make_watcher(root, manifest), lambda: (root / "k1").write_text("1"), 1)
+
+    assert bs.read_manifest_header(manifest) == (bs.DEFAULT_HASH_ALGORITHM, PUBLIC_KEY)
+    assert bs.load_manifest(manifest, PUBLIC_KEY).paths == ["k1"]
+    assert bs.load_manifest(f"{manifest}.1", old_public).paths == ["k0"]
+    with pytest.raises(ValueError):
+        bs.load_manifest(f"{manifest}.1", PUBLIC_KEY)
+
+
+def test_folder_watcher_skips_manifest_backups(tmp_path):
+    root = tmp_path / "root"
+    root.mkdir()
+    manifest = root / "signatures.manifest"
+    (root / "signatures.manifest.1").write_text("# hash sha256\n")
+    (root / "signatures.manifest.txt").write_text("data")
+    run_watcher(make_watcher(root, manifest, sign_existing=True), lambda: None, 1)
+    assert bs.load_manifest(manifest, PUBLIC_KEY).paths == ["signatures.manifest.txt"]
+
+
+class FailingInotify:
+    """Bọc libc, giả lập ENOSPC khi đặt watch cho thư mục tên "full"."""
+
+    def __init__(self, libc):
+        self.libc = libc
+
+    def __getattr__(self, name):
+        return getattr(self.libc, name)
+
+    def inotify_add_watch(self, fd, path, mask):
+        if os.path.basename(path) == b"full":
+            ctypes.set_errno(errno.ENOSPC)
+            return -1
+        return self.libc.inotify_add_watch(fd, path, mask)
+
+
+def test_folder_watcher_rescans_unwatched_directories(tmp_path):
+    root = tmp_path / "root"
+    (root / "full").mkdir(parents=True)
+    manifest = tmp_path / "signatures.manifest"
+    watcher = make_watcher(root, manifest)
+    if watcher._inotify is None:
+        pytest.skip("cần inotify")
+    watcher._inotify = FailingInotify(watcher._inotify)
+    run_watcher(watcher, lambda: (root / "full" / "new").write_text("new"), 1)
+    assert watcher._unwatched == {str(root / "full")}
+    assert bs.load_manifest(manifest, PUBLIC_KEY).paths == [os.path.join("full", "new")]
+
+
+def test_folder_watcher_forgets_removed_directories(tmp_path):
+    root = tmp_path / "root"
+    (root / "gone" / "deep").mkdir(parents=True)
+    (root / "gone" / "deep" / "f").write_text("f")
+    manifest = tmp_path / "signatures.manifest"
+    watcher = make_watcher(root, manifest)
+    if watcher._inotify is None:
+        pytest.skip("cần inotify")
+
+    def action():
+        shutil.rmtree(root / "gone")
+        (root / "done").write_text("done")
+
+    run_watcher(watcher, action, 1)
+    assert list(watcher.index) == [str(root / "done")]
+    assert all(not d.startswith(str(root / "gone")) for d in watcher._watches.values())
+
+
+def test_folder_watcher_skips_names_with_newlines(tmp_path, caplog):
+    root = tmp_path / "root"
+    root.mkdir()
+    manifest = tmp_path / "signatures.manifest"
+    watcher = make_watcher(root, manifest)
+
+    def action():
+        (root / "bad\nname").write_text("bad")
+        (root / "good").write_text("good")
+
+    run_watcher(watcher, action, 1)
+    assert bs.load_manifest(manifest, PUBLIC_KEY).paths == ["good"]
+    assert "bad\\nname" in caplog.text
+
+
+def test_watch_mode_stops_on_sigterm(tmp_path):
+    (tmp_path / "root").mkdir()
+    script = os.path.join(os.path.dirname(os.path.abspath(bs.__file__)), "basic_signature.py")
+    process = subprocess.Popen(
+        [sys.executable, "-u", script, "--watch", "root", "--keysize", "512"],
+        cwd=tmp_path, env={**os.environ, "HOME": str(tmp_path)},
+        stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True,
+    )
+    try:
+        for line in process.stdout:
+            if line.startswith("Dấu vân tay"):
+                break
+        process.send_signal(signal.SIGTERM)
+        assert process.wait(timeout=10) == 0
+    finally:
+        process.kill()
+        process.stdout.close()
+
+
+def test_module_imports_without_tkinter():
+    # --watch và benchmark chạy trên máy không có giao diện đồ họa
+    code = "import sys; sys.modules['tkinter'] = None; import basic_signature"
+    subprocess.run([sys.executable, "-c", code], check=True,
+                   cwd=os.path.dirname(os.path.abspath(bs.__file__)))
+
+
+# Ngữ cảnh khóa dùng chung
+
+def test_key_context_round_trip():
+    context = bs.KeyContext.from_keys(PUBLIC_KEY, PRIVATE_KEY, (P, Q))
+    restored = bs.KeyContext.deserialize(context.serialize())
+    for name in bs.KeyContext.__slots__:
+        assert getattr(restored, name) == getattr(context, name)
+    hashes = digests(5)
+    assert restored.sign_hashes(hashes) == [bs.sign_message(PRIVATE_KEY, h) for h in hashes]
+
+
+def test_verify_many_in_processes():
+    hashes = digests(20)
+    signatures = [bs.sign_message(PRIVATE_KEY, h) for h in hashes]
+    signatures[7] += 1
+    expected = [index != 7 for index in range(len(hashes))]
+    assert bs.verify_many(hashes, signatures, PUBLIC_KEY, processes=2) == expected
+
+
+# Ký an toàn
+
+@pytest.mark.parametrize("exponent", [0, 1, 2, 15, 16, 17, 0xFFFF, 2 ** 126 + 12345, 2 ** 200 + 12345])
+def test_mod_pow_window_matches_pow(exponent):
+    modulus = 2 ** 127 - 1
+    assert bs.mod_pow_window(3, exponent, modulus) == pow(3, exponent, modulus)
+    assert bs.mod_pow_window(3, exponent, modulus, bits=8) == pow(3, exponent, modulus)
+
+
+@pytest.mark.parametrize("primes", [None, (P, Q)])
+def test_hardened_signer_matches_plain_signature(primes):
+    hashes = digests(10)
+    expected = [bs.sign_message(PRIVATE_KEY, h) for h in hashes]
+    context = bs.KeyContext.from_keys(PUBLIC_KEY, PRIVATE_KEY, primes)
+    assert bs.HardenedSigner(context).sign_hashes(hashes) == expected
+    assert bs.sign_many(PRIVATE_KEY, hashes, primes=primes, processes=2,
+                        public_key=PUBLIC_KEY, hardened=True) == expected
+
+
+def test_hardened_signer_needs_both_exponents():
+    with pytest.raises(ValueError):
+        bs.HardenedSigner(bs.KeyContext.from_keys(private_key=PRIVATE_KEY))